@@ -179,6 +179,9 @@ ORDER BY zona;
 
 
 -- ─── 6. ANÁLISIS POR FRANJA HORARIA ─────────────────────────────────────────
+-- Clasifica cada jornada solo por h_inicio. Para repartir la duración real de
+-- cada jornada sobre las 24 horas (una jornada 13:34→23:56 aporta 4 h a PICO)
+-- usar el índice horario: `python src/indice_horario.py`
 
 SELECT
     CASE
@@ -218,6 +221,9 @@ ORDER BY p.pedidos_proyectados;
 
 
 -- ─── 8. ANÁLISIS DE SENSIBILIDAD — ESCENARIOS RO ────────────────────────────
+-- Escenarios fijos. El barrido empírico de umbrales (RO_min × RO_max × RO_crítico
+-- × ventana PICO) contra utilidad_neta/eficiencia se genera con
+-- `python src/barrido_umbrales.py` → data/processed/barrido_sensibilidad.csv
 
 SELECT
     escenario,
@@ -6,17 +6,21 @@ DiDi Food · Gig Economy · San Cristóbal Sur, Bogotá D.C.
 Arquitectura:   Patrón Z · KPIs (área óptica primaria) → Gráfico asimetría
                 (centro) → Panel de Decisión Binarizada [SÍ/NO OPERAR] (área terminal)
 HOPs:           50 trayectorias de regresión simuladas · β=$14,940 · σ=$51,320
+Proyección:     modelo multivariable de modelo_prescriptivo.py
+                (data/processed/modelo_coeficientes.json) si está exportado;
+                si no, β·pedidos + intercepto con FACTOR_EFIC_CRITICA (v1.2)
 Umbrales:       Óptimo [1.73–1.84] · Crítico [≥2.0]
+Caché:          Figuras y métricas independientes de las entradas se construyen
+                una vez por versión del dataset (figuras.py, serializadas);
+                cada rerun solo recalcula decisión, estrella y línea RO.
+                Monte Carlo: base por versión + N_TRAYECTORIAS_DSS (~5 ms)
+                cacheado por entradas.
 Ejecución:      streamlit run src/app_copiloto.py
 ================================================================================
 """
 
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
 import os, sys
 
 # ─── Importar pipeline ETL ───────────────────────────────────────────────────
@@ -34,14 +38,20 @@ except ImportError:
     RO_OPTIMO_MAX       = 1.84
     RO_CRITICO          = 2.00
     FACTOR_EFIC_CRITICA = 0.973
-
-# ─── Paleta Tufte ────────────────────────────────────────────────────────────
-COLOR_GRIS   = '#D3D3D3'
-COLOR_VERDE  = '#2ECC71'
-COLOR_ROJO   = '#E74C3C'
-COLOR_AZUL   = '#3498DB'
-COLOR_TEXTO  = '#2C3E50'
-BG_DARK      = '#0E1117'
+try:
+    from simulacion_montecarlo import preparar_base, simular_turno, N_TRAYECTORIAS_DSS
+    SIMULADOR_DISPONIBLE = True
+except ImportError:
+    SIMULADOR_DISPONIBLE = False
+try:
+    from modelo_prescriptivo import cargar_coeficientes, predecir_utilidad
+    MODELO = cargar_coeficientes()
+except (ImportError, OSError, ValueError):
+    MODELO = None   # Sin coeficientes exportados → constantes v1.2
+from figuras import (
+    version_dataset, construir_estaticas, figura_hops_base, serializar,
+    deserializar, agregar_proyeccion, agregar_linea_ro
+)
 
 # ─── Configuración de página ─────────────────────────────────────────────────
 st.set_page_config(
@@ -82,8 +92,8 @@ st.markdown("""
 # ─────────────────────────────────────────────────────────────────────────────
 
 @st.cache_data(ttl=300)
-def cargar_datos() -> pd.DataFrame:
-    """Carga o regenera el dataset procesado (recalibra en cada ejecución)."""
+def cargar_datos() -> tuple:
+    """Carga o regenera el dataset procesado · retorna (df, versión del dataset)."""
     processed_path = os.path.join(BASE_DIR, 'data', 'processed', 'didi_procesado_v1.1.csv')
     if not os.path.exists(processed_path):
         try:
@@ -91,20 +101,33 @@ def cargar_datos() -> pd.DataFrame:
         except Exception:
             pass
     if os.path.exists(processed_path):
-        return pd.read_csv(processed_path)
+        df = pd.read_csv(processed_path)
+        return df, version_dataset(df)
     else:
         st.error("Dataset no encontrado. Ejecuta `python src/main.py` primero.")
         st.stop()
 
-df = cargar_datos()
-n_total    = len(df)
-n_valido   = int((df['flag_gasto_cero'] == 0).sum())
-roi_periodo = round(
-    df.loc[df['flag_gasto_cero']==0, 'utilidad_neta'].sum() /
-    df.loc[df['flag_gasto_cero']==0, 'gastos_operativos'].sum() * 100, 2
-)
-ro_media   = round(df['ratio_optimizacion'].mean(), 3)
-ro_mediana = round(df['ratio_optimizacion'].median(), 3)
+
+@st.cache_data(max_entries=4)
+def cargar_estaticas(version: str, _df: pd.DataFrame) -> dict:
+    """KPIs, contexto y figuras de Tabs 1/3/4 · una vez por versión del dataset."""
+    return construir_estaticas(_df)
+
+
+@st.cache_data(max_entries=32)
+def cargar_hops(version: str, n_hops: int, _df: pd.DataFrame) -> str:
+    """Tab 2 sin proyección (HOPs + OLS + históricos) · por versión y n_hops."""
+    return serializar(figura_hops_base(_df, n_hops))
+
+
+df, version = cargar_datos()
+estaticas  = cargar_estaticas(version, df)
+kpis       = estaticas['kpis']
+n_total    = kpis['n_total']
+n_valido   = kpis['n_valido']
+roi_periodo = kpis['roi_periodo']
+ro_media   = kpis['ro_media']
+ro_mediana = kpis['ro_mediana']
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -152,11 +175,22 @@ hora_int  = int(hora_inicio.split(':')[0])
 es_pico   = 17 <= hora_int < 21
 zona_opt  = RO_OPTIMO_MIN <= ro_input <= RO_OPTIMO_MAX
 alerta    = ro_input >= RO_CRITICO
-factor_ef = FACTOR_EFIC_CRITICA if alerta else 1.0
 
 # Utilidad esperada puntual
-util_esperada = int(BETA_PEDIDO * pedidos_input + INTERCEPTO)
-util_ajustada = int(util_esperada * factor_ef)
+if MODELO is not None:
+    # El coeficiente de alerta_critica ya recoge la caída de eficiencia → sin factor extra
+    factor_ef     = 1.0
+    util_ajustada = int(predecir_utilidad(MODELO, pedidos_input, ro_input, int(es_pico),
+                                          df['duracion_horas'].median()))
+    beta_pedido   = MODELO['coeficientes']['pedidos_fisicos']
+    sigma_modelo  = MODELO['sigma_residual']
+    fuente_modelo = f"Modelo multivariable · N={MODELO['n']:,}"
+else:
+    factor_ef     = FACTOR_EFIC_CRITICA if alerta else 1.0
+    util_ajustada = int((BETA_PEDIDO * pedidos_input + INTERCEPTO) * factor_ef)
+    beta_pedido   = BETA_PEDIDO
+    sigma_modelo  = SIGMA_RESIDUAL
+    fuente_modelo = "Constantes v1.2"
 
 # Decisión binarizada
 if alerta:
@@ -176,13 +210,21 @@ else:
     decision_class = "decision-monitor"
     razon = f"RO={ro_input:.2f} fuera de zona óptima. Continuar con vigilancia de RO."
 
-# HOPs: 50 trayectorias de regresión con σ residual
-np.random.seed(42)
-pedidos_range = np.linspace(1, 25, 50)
-hops_matrix   = np.array([
-    BETA_PEDIDO * pedidos_range + INTERCEPTO + np.random.normal(0, SIGMA_RESIDUAL, 50)
-    for _ in range(n_hops)
-])
+# Decisión probabilística Monte Carlo (complementa la regla por umbrales)
+@st.cache_data(max_entries=4)
+def cargar_base_mc(version: str, _df: pd.DataFrame) -> dict:
+    """Base empírica del bootstrap · una vez por versión del dataset."""
+    return preparar_base(_df)
+
+
+@st.cache_data(ttl=300)
+def simular_decision(version: str, _df: pd.DataFrame, pedidos: int, ro: float, hora: str) -> dict:
+    """P(utilidad/h > costo de oportunidad) · cacheada por entradas y versión del dataset."""
+    return simular_turno(cargar_base_mc(version, _df), pedidos=pedidos, ro=ro,
+                         hora_inicio=hora, n_trayectorias=N_TRAYECTORIAS_DSS)
+
+sim_mc = simular_decision(version, df, pedidos_input, ro_input, hora_inicio) \
+    if SIMULADOR_DISPONIBLE else None
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -204,17 +246,15 @@ with col2:
               delta=f"Mediana: {ro_mediana:.3f}x",
               delta_color="off")
 with col3:
-    st.metric("β Modelo", f"${BETA_PEDIDO:,}",
-              delta="COP/pedido",
+    st.metric("β Modelo", f"${beta_pedido:,.0f}",
+              delta=f"COP/pedido · {fuente_modelo}",
               delta_color="off")
 with col4:
-    km_fantasma = round(df['km_fantasma'].sum(), 1)
-    st.metric("km Fantasma", f"{km_fantasma:,} km",
-              delta=f"{round(km_fantasma/df['km_google'].sum()*100,1)}% de divergencia",
+    st.metric("km Fantasma", f"{kpis['km_fantasma']:,} km",
+              delta=f"{kpis['pct_fantasma']}% de divergencia",
               delta_color="off")
 with col5:
-    prop_bono = round(df['complemento_bono'].sum() / df['garantizado_meta'].sum() * 100, 1)
-    st.metric("Ingreso-Arbitraje", f"{prop_bono}%",
+    st.metric("Ingreso-Arbitraje", f"{kpis['prop_bono']}%",
               delta="del ingreso bruto",
               delta_color="off")
 
@@ -228,54 +268,11 @@ tab1, tab2, tab3, tab4 = st.tabs([
     "📦 Distribución ROI"
 ])
 
-# ── TAB 1: Asimetría Algorítmica ─────────────────────────────────────────────
+# ── TAB 1: Asimetría Algorítmica (estática) ─────────────────────────────────
 with tab1:
-    fig1 = go.Figure()
-    jornadas = list(range(n_total))
-    fig1.add_trace(go.Scatter(
-        x=jornadas, y=df['km_google'],
-        name='km Reales (Google Maps)', line=dict(color=COLOR_GRIS, width=2),
-        fill=None
-    ))
-    fig1.add_trace(go.Scatter(
-        x=jornadas, y=df['km_didi'],
-        name=f"km Percibidos (DiDi · RO={ro_media:.3f}x)",
-        line=dict(color=COLOR_AZUL, width=2.5),
-        fill='tonexty', fillcolor='rgba(52,152,219,0.15)'
-    ))
-    fig1.update_layout(
-        title=dict(
-            text=f"La asimetría algorítmica genera {round(df['km_fantasma'].sum()/df['km_google'].sum()*100,1)}% de distancia fantasma",
-            font=dict(size=14, color=COLOR_TEXTO)
-        ),
-        xaxis_title="Jornada Operativa",
-        yaxis_title="Kilómetros",
-        plot_bgcolor='white', paper_bgcolor='white',
-        showlegend=True, legend=dict(x=0.01, y=0.99),
-        yaxis=dict(rangemode='tozero'),
-        xaxis=dict(showgrid=False),
-    )
-    fig1.update_xaxes(showgrid=False)
-    fig1.update_yaxes(showgrid=False, zeroline=True, zerolinewidth=1)
-    # Anotaciones directas Tufte
-    fig1.add_annotation(
-        x=0.02, y=0.95, xref='paper', yref='paper',
-        text=f"km Reales: {round(df['km_google'].sum()):,} km",
-        showarrow=False, font=dict(color=COLOR_GRIS, size=11)
-    )
-    fig1.add_annotation(
-        x=0.02, y=0.88, xref='paper', yref='paper',
-        text=f"km Percibidos: {round(df['km_didi'].sum()):,} km",
-        showarrow=False, font=dict(color=COLOR_AZUL, size=11)
-    )
-    fig1.add_annotation(
-        x=0.02, y=0.81, xref='paper', yref='paper',
-        text=f"km Fantasma: {round(df['km_fantasma'].sum()):,} km",
-        showarrow=False, font=dict(color=COLOR_ROJO, size=11, weight='bold')
-    )
-    st.plotly_chart(fig1, use_container_width=True)
+    st.plotly_chart(deserializar(estaticas['fig1']), use_container_width=True)
 
-# ── TAB 2: HOPs ──────────────────────────────────────────────────────────────
+# ── TAB 2: HOPs (base cacheada por n_hops + proyección de hoy) ───────────────
 with tab2:
     st.markdown(f"""
     **Hypothetical Outcome Plots (HOPs)** — {n_hops} trayectorias simuladas
@@ -284,158 +281,18 @@ with tab2:
     con `ε ~ N(0, σ={SIGMA_RESIDUAL:,})`. El punto rojo es tu proyección de hoy.
     El rango sombreado captura el 90% de los resultados posibles.
     """)
-    fig2 = go.Figure()
-    # Trazar HOPs (líneas grises semitransparentes)
-    for i in range(n_hops):
-        fig2.add_trace(go.Scatter(
-            x=pedidos_range, y=hops_matrix[i],
-            mode='lines', line=dict(color='rgba(200,200,200,0.3)', width=1),
-            showlegend=False, hoverinfo='skip'
-        ))
-    # Línea media OLS
-    y_media = BETA_PEDIDO * pedidos_range + INTERCEPTO
-    fig2.add_trace(go.Scatter(
-        x=pedidos_range, y=y_media,
-        mode='lines', name=f'y = {BETA_PEDIDO:,}x + ({INTERCEPTO:,})',
-        line=dict(color=COLOR_AZUL, width=3)
-    ))
-    # Banda IC 90%
-    y_p5  = np.percentile(hops_matrix, 5, axis=0)
-    y_p95 = np.percentile(hops_matrix, 95, axis=0)
-    fig2.add_trace(go.Scatter(
-        x=np.concatenate([pedidos_range, pedidos_range[::-1]]),
-        y=np.concatenate([y_p95, y_p5[::-1]]),
-        fill='toself', fillcolor='rgba(52,152,219,0.15)',
-        line=dict(color='rgba(0,0,0,0)'),
-        name='IC 90% (HOPs)',
-        showlegend=True
-    ))
-    # Puntos del dataset histórico
-    fig2.add_trace(go.Scatter(
-        x=df['pedidos_fisicos'], y=df['utilidad_neta'],
-        mode='markers', name='Jornadas históricas',
-        marker=dict(color=COLOR_AZUL, size=8, opacity=0.7,
-                    line=dict(color='white', width=1))
-    ))
-    # Proyección actual (punto rojo)
-    fig2.add_trace(go.Scatter(
-        x=[pedidos_input], y=[util_ajustada],
-        mode='markers+text', name='Proyección hoy',
-        marker=dict(color=COLOR_ROJO, size=14, symbol='star',
-                    line=dict(color='white', width=2)),
-        text=[f'${util_ajustada:,}'], textposition='top center',
-        textfont=dict(color=COLOR_ROJO, size=12)
-    ))
-    fig2.update_layout(
-        title=dict(
-            text=f"pedidos_fisicos={pedidos_input} → utilidad esperada: ${util_ajustada:,} COP (ajuste eficiencia: {factor_ef})",
-            font=dict(size=13)
-        ),
-        xaxis_title="Pedidos Físicos Completados",
-        yaxis_title="Utilidad Neta (COP)",
-        plot_bgcolor='white', paper_bgcolor='white',
-        yaxis=dict(rangemode='tozero', tickprefix='$', tickformat=','),
-        xaxis=dict(showgrid=False),
-    )
-    fig2.update_yaxes(showgrid=False)
-    fig2.update_xaxes(showgrid=False)
+    fig2 = agregar_proyeccion(deserializar(cargar_hops(version, n_hops, df)),
+                              pedidos_input, util_ajustada, factor_ef)
     st.plotly_chart(fig2, use_container_width=True)
 
-# ── TAB 3: Punto de Quiebre RO ───────────────────────────────────────────────
+# ── TAB 3: Punto de Quiebre RO (base estática + línea RO de hoy) ─────────────
 with tab3:
-    fig3 = go.Figure()
-    # Zona óptima (sombreado verde)
-    fig3.add_vrect(
-        x0=RO_OPTIMO_MIN, x1=RO_OPTIMO_MAX,
-        fillcolor="rgba(46,204,113,0.15)", line_width=0,
-        annotation_text="Zona Óptima", annotation_position="top left",
-        annotation_font_color=COLOR_VERDE
-    )
-    # Línea umbral crítico
-    fig3.add_vline(x=RO_CRITICO, line_dash='dash', line_color=COLOR_ROJO,
-                   annotation_text="Umbral Crítico (RO=2.0)",
-                   annotation_font_color=COLOR_ROJO)
-    # Scatter por zona
-    colores_zona = df['ratio_optimizacion'].apply(
-        lambda r: COLOR_VERDE if RO_OPTIMO_MIN <= r <= RO_OPTIMO_MAX
-                  else (COLOR_ROJO if r >= RO_CRITICO else COLOR_GRIS)
-    )
-    fig3.add_trace(go.Scatter(
-        x=df['ratio_optimizacion'], y=df['eficiencia_cumplimiento'],
-        mode='markers',
-        marker=dict(color=colores_zona, size=10, opacity=0.85,
-                    line=dict(color='white', width=1)),
-        text=[f"RO={r:.2f} · Efic={e:.2%}" for r, e in
-              zip(df['ratio_optimizacion'], df['eficiencia_cumplimiento'])],
-        hoverinfo='text', showlegend=False
-    ))
-    # Línea RO input actual
-    fig3.add_vline(x=ro_input, line_dash='dot', line_color=COLOR_AZUL,
-                   annotation_text=f"RO hoy: {ro_input:.2f}",
-                   annotation_font_color=COLOR_AZUL)
-    # Anotaciones eficiencia por zona
-    ef_opt  = df.loc[(df['ratio_optimizacion']>=RO_OPTIMO_MIN) & (df['ratio_optimizacion']<=RO_OPTIMO_MAX), 'eficiencia_cumplimiento'].mean()
-    ef_crit = df.loc[df['ratio_optimizacion']>=RO_CRITICO, 'eficiencia_cumplimiento'].mean()
-    if not np.isnan(ef_opt):
-        fig3.add_annotation(x=1.785, y=1.05, text=f"Efic. Óptima: {ef_opt:.1%}",
-                            showarrow=False, font=dict(color=COLOR_VERDE, size=11))
-    if not np.isnan(ef_crit):
-        fig3.add_annotation(x=2.15, y=1.05, text=f"Efic. Crítica: {ef_crit:.1%}",
-                            showarrow=False, font=dict(color=COLOR_ROJO, size=11))
-    fig3.update_layout(
-        title="Punto de Quiebre: La eficiencia colapsa cuando el RO supera 2.0",
-        xaxis_title="Ratio de Optimización (RO = km_didi / km_google)",
-        yaxis_title="Eficiencia de Cumplimiento",
-        plot_bgcolor='white', paper_bgcolor='white',
-        yaxis=dict(tickformat='.0%', rangemode='tozero'),
-        xaxis=dict(showgrid=False),
-    )
-    fig3.update_yaxes(showgrid=False)
+    fig3 = agregar_linea_ro(deserializar(estaticas['fig3']), ro_input)
     st.plotly_chart(fig3, use_container_width=True)
 
-# ── TAB 4: Raincloud ROI ─────────────────────────────────────────────────────
+# ── TAB 4: Raincloud ROI (estática) ──────────────────────────────────────────
 with tab4:
-    roi_vals  = df['roi_diario'].dropna()
-    n_nan     = df['roi_diario'].isna().sum()
-    roi_medio = round(roi_vals.mean(), 2)
-    roi_med   = round(roi_vals.median(), 2)
-    fig4 = go.Figure()
-    # Strip plot (puntos individuales)
-    jitter = np.random.uniform(-0.05, 0.05, len(roi_vals))
-    fig4.add_trace(go.Scatter(
-        x=roi_vals, y=jitter - 0.3,
-        mode='markers', name='Jornadas individuales',
-        marker=dict(color=COLOR_AZUL, size=8, opacity=0.6,
-                    line=dict(color='white', width=1))
-    ))
-    # Boxplot
-    fig4.add_trace(go.Box(
-        x=roi_vals, y0=0, name='Distribución ROI',
-        boxpoints=False, line=dict(color=COLOR_GRIS, width=1.5),
-        fillcolor='rgba(200,200,200,0.3)',
-        median=dict(color=COLOR_ROJO, width=2)
-    ))
-    # Línea mediana
-    fig4.add_vline(x=roi_med, line_dash='dash', line_color=COLOR_ROJO,
-                   annotation_text=f"Mediana: {roi_med:.1f}%",
-                   annotation_font_color=COLOR_ROJO)
-    # Anotación Brecha de Integridad
-    fig4.add_annotation(
-        x=roi_vals.max() * 0.75, y=0.35,
-        text=f"⚠ Brecha de Integridad: {n_nan} jornadas<br>(Gasto $0 → ROI = NaN)",
-        showarrow=False,
-        bgcolor='rgba(231,76,60,0.15)', bordercolor=COLOR_ROJO,
-        font=dict(color=COLOR_ROJO, size=11)
-    )
-    fig4.update_layout(
-        title=f"ROI auditado: {roi_medio:.2f}% (media) · {roi_med:.2f}% (mediana) · N válido={len(roi_vals)}",
-        xaxis_title="ROI Diario (%)",
-        yaxis=dict(visible=False, range=[-0.6, 0.6]),
-        plot_bgcolor='white', paper_bgcolor='white',
-        xaxis=dict(rangemode='tozero', showgrid=False),
-        showlegend=False
-    )
-    st.plotly_chart(fig4, use_container_width=True)
+    st.plotly_chart(deserializar(estaticas['fig4']), use_container_width=True)
 
 # ─────────────────────────────────────────────────────────────────────────────
 # ZONA INFERIOR — PANEL DE DECISIÓN BINARIZADA (área terminal del patrón Z)
@@ -453,6 +310,17 @@ with col_decision:
         <p style="color:#BDC3C7; margin-top:8px; font-size:0.9rem">{razon}</p>
     </div>
     """, unsafe_allow_html=True)
+    if sim_mc is not None:
+        st.metric(f"P(utilidad/h > ${sim_mc['umbral']:,.0f}/h)",
+                  f"{sim_mc['prob_supera_umbral']:.1%}",
+                  delta=f"Monte Carlo: {sim_mc['decision']}",
+                  delta_color="off")
+        st.caption(f"IC 90% utilidad: ${sim_mc['utilidad_p5']:,.0f} – "
+                   f"${sim_mc['utilidad_p95']:,.0f} · "
+                   f"P(> mediana histórica ${sim_mc['mediana_historica']:,.0f}): "
+                   f"{sim_mc['prob_supera_mediana']:.1%} · "
+                   f"P(pérdida): {sim_mc['prob_perdida']:.1%} · "
+                   f"{sim_mc['n_trayectorias']:,} trayectorias")
 
 with col_detalle:
     st.markdown("**Variables de entrada procesadas:**")
@@ -472,22 +340,20 @@ with col_detalle:
                   "✅ Óptima" if zona_opt else ("🔴 Crítica" if alerta else "🟡 Neutral"),
                   delta=f"[{RO_OPTIMO_MIN}–{RO_OPTIMO_MAX}]" if zona_opt else
                         (f"≥{RO_CRITICO}" if alerta else "Monitorear"))
-        st.metric("σ residual", f"${SIGMA_RESIDUAL:,}",
-                  delta="Error estándar modelo", delta_color="off")
+        st.metric("σ residual", f"${sigma_modelo:,.0f}",
+                  delta=fuente_modelo, delta_color="off")
 
 with col_contexto:
     st.markdown("**Contexto histórico del período:**")
-    jornadas_optimas = int(df['zona_arbitraje_optima'].sum())
-    jornadas_criticas = int(df['alerta_critica'].sum())
-    jornadas_pico = int(df['franja_pico'].sum())
-    st.metric("Jornadas en zona óptima", f"{jornadas_optimas}/{n_total}",
-              delta=f"{round(jornadas_optimas/n_total*100,1)}% del período",
+    ctx = estaticas['contexto']
+    st.metric("Jornadas en zona óptima", f"{ctx['optimas']}/{n_total}",
+              delta=f"{ctx['pct_optimas']}% del período",
               delta_color="normal")
-    st.metric("Jornadas en zona crítica", f"{jornadas_criticas}/{n_total}",
-              delta=f"{round(jornadas_criticas/n_total*100,1)}% del período",
+    st.metric("Jornadas en zona crítica", f"{ctx['criticas']}/{n_total}",
+              delta=f"{ctx['pct_criticas']}% del período",
               delta_color="inverse")
-    st.metric("Jornadas en franja PICO", f"{jornadas_pico}/{n_total}",
-              delta=f"{round(jornadas_pico/n_total*100,1)}% del período",
+    st.metric("Jornadas en franja PICO", f"{ctx['pico']}/{n_total}",
+              delta=f"{ctx['pct_pico']}% del período",
               delta_color="normal")
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -0,0 +1,264 @@
+"""
+================================================================================
+BARRIDO DE PARÁMETROS v1.2 — UMBRALES RO Y VENTANA PICO
+Sistema de Soporte a la Decisión · DiDi Food · San Cristóbal Sur, Bogotá D.C.
+================================================================================
+Objetivo:       Contrastar RO_OPTIMO_MIN, RO_OPTIMO_MAX, RO_CRITICO, PICO_INICIO
+                y PICO_FIN (fijados con N=25) contra los resultados históricos
+                (utilidad_neta, eficiencia_cumplimiento, utilidad_por_hora).
+Índice:         RO ordenado + sumas prefijas → cada combinación se evalúa con
+                dos búsquedas binarias (O(log N)) · franja PICO con sumas
+                prefijas por hora de inicio (O(1)).
+Paralelismo:    Combinaciones particionadas en shards · ProcessPoolExecutor.
+Salida:         Ranking de combinaciones + grilla de sensibilidad RO_min × RO_max
+                (versión empírica de la sección 8 de queries_auditoria.sql).
+Ejecución:      python src/barrido_umbrales.py
+================================================================================
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from main import (
+    RO_OPTIMO_MIN, RO_OPTIMO_MAX, RO_CRITICO, PICO_INICIO, PICO_FIN,
+    PROCESSED_PATH, BASE_DIR
+)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# REJILLA POR DEFECTO
+# ─────────────────────────────────────────────────────────────────────────────
+REJILLA_DEFECTO = {
+    'ro_optimo_min': np.round(np.arange(1.50, 1.90, 0.01), 2),
+    'ro_optimo_max': np.round(np.arange(1.60, 2.00, 0.01), 2),
+    'ro_critico':    np.round(np.arange(1.85, 2.31, 0.05), 2),
+    'pico_inicio':   np.arange(14, 21),
+    'pico_fin':      np.arange(18, 25),
+}
+PARAMETROS  = list(REJILLA_DEFECTO)
+MIN_SOPORTE = 3        # Jornadas mínimas por zona para considerar la combinación
+N_SHARDS    = 32
+
+RANKING_PATH      = os.path.join(BASE_DIR, 'data', 'processed', 'barrido_ranking.csv')
+SENSIBILIDAD_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'barrido_sensibilidad.csv')
+
+_INDICE = None   # Índice compartido por los procesos del pool (ver _inicializar_worker)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 1: ÍNDICE ORDENADO + SUMAS PREFIJAS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _prefijo(x: np.ndarray) -> np.ndarray:
+    """Suma prefija con 0 inicial: suma(x[i:j]) = P[j] - P[i]."""
+    return np.concatenate([[0.0], np.cumsum(x, dtype=float)])
+
+
+def construir_indice(df: pd.DataFrame) -> dict:
+    """
+    Ordena las jornadas por RO y precalcula sumas prefijas de utilidad_neta y
+    eficiencia_cumplimiento; agrega utilidad_por_hora por hora de inicio (0–23).
+    Jornadas con métricas no finitas se excluyen del barrido.
+    """
+    cols = ['ratio_optimizacion', 'utilidad_neta', 'eficiencia_cumplimiento', 'utilidad_por_hora']
+    df = df.loc[np.isfinite(df[cols].to_numpy(dtype=float)).all(axis=1)]
+    if df.empty:
+        raise ValueError("[BARRIDO ERROR] Sin jornadas con métricas finitas")
+
+    orden = np.argsort(df['ratio_optimizacion'].to_numpy(), kind='stable')
+    hora  = df['h_inicio'].astype(str).str.strip().str.split(':').str[0].astype(int).to_numpy() % 24
+    uph   = df['utilidad_por_hora'].to_numpy(dtype=float)
+
+    return {
+        'n':         len(df),
+        'ro':        df['ratio_optimizacion'].to_numpy(dtype=float)[orden],
+        'p_util':    _prefijo(df['utilidad_neta'].to_numpy(dtype=float)[orden]),
+        'p_efic':    _prefijo(df['eficiencia_cumplimiento'].to_numpy(dtype=float)[orden]),
+        # Índice 24 (hora fin exclusiva = 24:00) queda cubierto por el prefijo de 25 posiciones
+        'p_hora_n':   _prefijo(np.bincount(hora, minlength=24)),
+        'p_hora_uph': _prefijo(np.bincount(hora, weights=uph, minlength=24)),
+    }
+
+
+def generar_combinaciones(rejilla: dict = None) -> np.ndarray:
+    """
+    Producto cartesiano de la rejilla → matriz (k × 5) en el orden de PARAMETROS.
+    Solo combinaciones coherentes: min < max < crítico (zonas disjuntas,
+    como en calcular_features_ro) e inicio < fin para la ventana PICO.
+    """
+    rejilla = {**REJILLA_DEFECTO, **(rejilla or {})}
+    mallas  = np.meshgrid(*(np.asarray(rejilla[p], dtype=float) for p in PARAMETROS),
+                          indexing='ij')
+    combos  = np.stack([m.ravel() for m in mallas], axis=1)
+    validas = (
+        (combos[:, 0] < combos[:, 1]) &
+        (combos[:, 1] < combos[:, 2]) &
+        (combos[:, 3] < combos[:, 4])
+    )
+    return combos[validas]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 2: EVALUACIÓN VECTORIZADA
+# ─────────────────────────────────────────────────────────────────────────────
+
+def evaluar_combinaciones(indice: dict, combos: np.ndarray,
+                          min_soporte: int = MIN_SOPORTE) -> pd.DataFrame:
+    """
+    Métricas por combinación:
+      lift_utilidad   = utilidad media en zona óptima − utilidad media fuera de ella
+      caida_eficiencia = eficiencia media óptima − eficiencia media crítica
+      lift_pico       = utilidad/hora media PICO − utilidad/hora media VALLE
+      puntaje         = lift_utilidad / |utilidad media global|
+                        + caida_eficiencia (ya es proporción, sin normalizar)
+                        + lift_pico / |utilidad/hora media global|
+    Combinaciones con menos de `min_soporte` jornadas en alguna zona → puntaje NaN.
+    """
+    n, ro = indice['n'], indice['ro']
+    p_util, p_efic = indice['p_util'], indice['p_efic']
+    p_hn, p_huph   = indice['p_hora_n'], indice['p_hora_uph']
+
+    lo   = np.searchsorted(ro, combos[:, 0], side='left')
+    hi   = np.searchsorted(ro, combos[:, 1], side='right')
+    crit = np.searchsorted(ro, combos[:, 2], side='left')
+    ini  = combos[:, 3].astype(int)
+    fin  = combos[:, 4].astype(int)
+
+    n_opt  = hi - lo
+    n_crit = n - crit
+    n_pico = p_hn[fin] - p_hn[ini]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        suma_util_opt = p_util[hi] - p_util[lo]
+        util_opt   = suma_util_opt / n_opt
+        util_resto = (p_util[-1] - suma_util_opt) / (n - n_opt)
+        efic_opt   = (p_efic[hi] - p_efic[lo]) / n_opt
+        efic_crit  = (p_efic[-1] - p_efic[crit]) / n_crit
+        suma_uph_pico = p_huph[fin] - p_huph[ini]
+        uph_pico   = suma_uph_pico / n_pico
+        uph_valle  = (p_huph[-1] - suma_uph_pico) / (n - n_pico)
+
+    util_media = p_util[-1] / n
+    uph_media  = p_huph[-1] / n
+    lift_util  = util_opt - util_resto
+    caida_efic = efic_opt - efic_crit
+    lift_pico  = uph_pico - uph_valle
+    puntaje    = (lift_util / abs(util_media) + caida_efic + lift_pico / abs(uph_media))
+
+    soporte_ok = (
+        (n_opt >= min_soporte) & (n - n_opt >= min_soporte) & (n_crit >= min_soporte) &
+        (n_pico >= min_soporte) & (n - n_pico >= min_soporte)
+    )
+    puntaje = np.where(soporte_ok, puntaje, np.nan)
+
+    res = pd.DataFrame(combos, columns=PARAMETROS)
+    res[['pico_inicio', 'pico_fin']] = res[['pico_inicio', 'pico_fin']].astype(int)
+    res['n_optima']          = n_opt
+    res['n_critica']         = n_crit
+    res['n_pico']            = n_pico.astype(int)
+    res['utilidad_optima']   = util_opt.round(0)
+    res['lift_utilidad']     = lift_util.round(0)
+    res['eficiencia_optima'] = efic_opt.round(4)
+    res['eficiencia_critica'] = efic_crit.round(4)
+    res['caida_eficiencia']  = caida_efic.round(4)
+    res['lift_pico']         = lift_pico.round(2)
+    res['puntaje']           = puntaje.round(4)
+    return res
+
+
+def _inicializar_worker(indice: dict):
+    global _INDICE
+    _INDICE = indice
+
+
+def _evaluar_shard(args) -> pd.DataFrame:
+    combos, min_soporte = args
+    return evaluar_combinaciones(_INDICE, combos, min_soporte)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 3: ORQUESTACIÓN Y SALIDAS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def barrer_umbrales(df: pd.DataFrame, rejilla: dict = None,
+                    n_procesos: int = None, min_soporte: int = MIN_SOPORTE) -> pd.DataFrame:
+    """
+    Evalúa todas las combinaciones de la rejilla y retorna el ranking
+    (puntaje descendente; combinaciones sin soporte al final).
+    n_procesos=1 evalúa en el proceso actual (sin pool).
+    """
+    indice = construir_indice(df)
+    combos = generar_combinaciones(rejilla)
+    n_procesos = n_procesos or os.cpu_count() or 1
+
+    if n_procesos == 1:
+        res = evaluar_combinaciones(indice, combos, min_soporte)
+    else:
+        shards = [(s, min_soporte) for s in np.array_split(combos, N_SHARDS) if len(s)]
+        with ProcessPoolExecutor(max_workers=n_procesos,
+                                 initializer=_inicializar_worker,
+                                 initargs=(indice,)) as pool:
+            res = pd.concat(pool.map(_evaluar_shard, shards), ignore_index=True)
+
+    res = res.sort_values('puntaje', ascending=False, na_position='last', kind='stable')
+    res.insert(0, 'rank', np.arange(1, len(res) + 1))
+    return res.reset_index(drop=True)
+
+
+def grilla_sensibilidad(ranking: pd.DataFrame, metrica: str = 'puntaje',
+                        ro_critico: float = RO_CRITICO,
+                        pico_inicio: int = PICO_INICIO,
+                        pico_fin: int = PICO_FIN) -> pd.DataFrame:
+    """
+    Grilla RO_min (filas) × RO_max (columnas) de `metrica` con RO_CRITICO y la
+    ventana PICO fijos en sus valores vigentes.
+    """
+    corte = ranking.loc[
+        np.isclose(ranking['ro_critico'], ro_critico) &
+        (ranking['pico_inicio'] == pico_inicio) &
+        (ranking['pico_fin'] == pico_fin)
+    ]
+    return corte.pivot_table(index='ro_optimo_min', columns='ro_optimo_max',
+                             values=metrica, aggfunc='first')
+
+
+def imprimir_ranking(ranking: pd.DataFrame, top: int = 10):
+    """Imprime el top del ranking y la posición de los umbrales vigentes."""
+    sep = "=" * 70
+    print(f"\n{sep}")
+    print("BARRIDO DE UMBRALES v1.2 — RANKING DE COMBINACIONES")
+    print(sep)
+    cols = PARAMETROS + ['n_optima', 'lift_utilidad', 'caida_eficiencia', 'lift_pico', 'puntaje']
+    print(ranking.head(top)[['rank'] + cols].to_string(index=False))
+    vigente = ranking.loc[
+        np.isclose(ranking['ro_optimo_min'], RO_OPTIMO_MIN) &
+        np.isclose(ranking['ro_optimo_max'], RO_OPTIMO_MAX) &
+        np.isclose(ranking['ro_critico'], RO_CRITICO) &
+        (ranking['pico_inicio'] == PICO_INICIO) & (ranking['pico_fin'] == PICO_FIN)
+    ]
+    print()
+    if vigente.empty:
+        print("  Umbrales vigentes: fuera de la rejilla evaluada")
+    else:
+        v = vigente.iloc[0]
+        print(f"  Umbrales vigentes: rank {int(v['rank']):,}/{len(ranking):,} · puntaje={v['puntaje']}")
+    print(f"{sep}\n")
+
+
+if __name__ == '__main__':
+    df = pd.read_csv(PROCESSED_PATH, dtype={'fecha': str, 'h_inicio': str, 'h_fin': str})
+    t0 = time.perf_counter()
+    ranking = barrer_umbrales(df)
+    t_barrido = time.perf_counter() - t0
+    print(f"  ✓ {len(ranking):,} combinaciones evaluadas en {t_barrido:.2f}s "
+          f"({len(ranking) / t_barrido:,.0f} comb/s)")
+    ranking.to_csv(RANKING_PATH, index=False)
+    grilla_sensibilidad(ranking).to_csv(SENSIBILIDAD_PATH)
+    print(f"  ✓ Ranking exportado: {RANKING_PATH}")
+    print(f"  ✓ Grilla de sensibilidad exportada: {SENSIBILIDAD_PATH}")
+    imprimir_ranking(ranking)
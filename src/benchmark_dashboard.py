@@ -0,0 +1,102 @@
+"""
+================================================================================
+BENCHMARK DSS v1.2 — LATENCIA DE RERUN DEL DASHBOARD
+Sistema de Soporte a la Decisión · DiDi Food · San Cristóbal Sur, Bogotá D.C.
+================================================================================
+Mide con streamlit.testing (sin navegador):
+  · Carga en frío: primera ejecución (construye y cachea las figuras estáticas)
+  · Rerun en caliente: cambio de cada entrada del sidebar (solo recalcula
+    decisión, Monte Carlo, estrella de proyección y línea RO)
+  · Componentes: construir estáticas vs decodificarlas desde la caché ·
+    Monte Carlo de una entrada nueva (N_TRAYECTORIAS_DSS)
+Objetivo:       p50 de rerun ≤ OBJETIVO_RERUN_MS
+Ejecución:      python src/benchmark_dashboard.py
+================================================================================
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from main import PROCESSED_PATH
+from figuras import construir_estaticas, figura_hops_base, serializar, deserializar
+from simulacion_montecarlo import preparar_base, simular_turno, N_TRAYECTORIAS_DSS
+
+APP_PATH          = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app_copiloto.py')
+OBJETIVO_RERUN_MS = 150
+N_RERUNS          = 5
+
+
+def _ms(t0: float) -> float:
+    return (time.perf_counter() - t0) * 1000
+
+
+def medir_componentes(df: pd.DataFrame, repeticiones: int = 5) -> dict:
+    """Costo de construir las piezas estáticas vs leerlas desde la caché serializada."""
+    t0 = time.perf_counter()
+    for _ in range(repeticiones):
+        estaticas = construir_estaticas(df)
+        hops = serializar(figura_hops_base(df, 50))
+    construir = _ms(t0) / repeticiones
+    t0 = time.perf_counter()
+    for _ in range(repeticiones):
+        for clave in ('fig1', 'fig3', 'fig4'):
+            deserializar(estaticas[clave])
+        deserializar(hops)
+    decodificar = _ms(t0) / repeticiones
+    base = preparar_base(df)
+    t0 = time.perf_counter()
+    for i in range(repeticiones):
+        simular_turno(base, pedidos=10 + i, ro=1.78, hora_inicio='18:00',
+                      n_trayectorias=N_TRAYECTORIAS_DSS)
+    montecarlo = _ms(t0) / repeticiones
+    return {'construir_ms': construir, 'cache_ms': decodificar, 'montecarlo_ms': montecarlo}
+
+
+def medir_reruns(n_reruns: int = N_RERUNS) -> dict:
+    """Latencias de la app completa: frío + reruns por cada entrada del sidebar."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    t0 = time.perf_counter()
+    at.run()
+    frio = _ms(t0)
+    if at.exception:
+        raise RuntimeError(f"[BENCHMARK ERROR] La app falló: {at.exception}")
+
+    cambios = (
+        [lambda v=v: at.sidebar.slider[0].set_value(v) for v in range(10, 10 + n_reruns)] +
+        [lambda v=v: at.sidebar.number_input[0].set_value(v)
+         for v in np.round(np.linspace(1.5, 2.2, n_reruns), 2)] +
+        [lambda i=i: at.sidebar.selectbox[0].set_value(f"{17 + i:02d}:00") for i in range(n_reruns)]
+    )
+    latencias = []
+    for cambio in cambios:
+        cambio()
+        t0 = time.perf_counter()
+        at.run()
+        latencias.append(_ms(t0))
+    return {'frio_ms': frio, 'reruns_ms': np.array(latencias)}
+
+
+if __name__ == '__main__':
+    df = pd.read_csv(PROCESSED_PATH)
+    comp = medir_componentes(df)
+    res  = medir_reruns()
+    p50, p95 = np.percentile(res['reruns_ms'], [50, 95])
+    sep = "=" * 70
+    print(f"\n{sep}")
+    print("BENCHMARK DSS v1.2 — LATENCIA DE RERUN")
+    print(sep)
+    print(f"  Figuras estáticas construidas:  {comp['construir_ms']:.1f} ms")
+    print(f"  Figuras estáticas desde caché:  {comp['cache_ms']:.1f} ms")
+    print(f"  {f'Monte Carlo ({N_TRAYECTORIAS_DSS:,} tray.):':<32}{comp['montecarlo_ms']:.1f} ms")
+    print(f"  Carga en frío (1ª ejecución):   {res['frio_ms']:.0f} ms")
+    print(f"  Rerun en caliente (n={len(res['reruns_ms'])}):    p50={p50:.0f} ms · p95={p95:.0f} ms")
+    estado = "✅ CUMPLE" if p50 <= OBJETIVO_RERUN_MS else "❌ NO CUMPLE"
+    print(f"  Objetivo p50 ≤ {OBJETIVO_RERUN_MS} ms:          {estado}")
+    print(f"{sep}\n")
@@ -0,0 +1,203 @@
+"""
+================================================================================
+CAPA DE CONSULTAS v1.2 — ÍNDICES ORDENADOS Y BITMAPS SOBRE JORNADAS
+Sistema de Soporte a la Decisión · DiDi Food · San Cristóbal Sur, Bogotá D.C.
+================================================================================
+Objetivo:       Reemplazar las máscaras booleanas sobre el frame completo
+                (p.ej. df.loc[(ro>=RO_OPTIMO_MIN)&(ro<=RO_OPTIMO_MAX)]) por
+                búsquedas sobre índices construidos una sola vez.
+Índices:        Ordenados   → fecha, ratio_optimizacion (búsqueda binaria)
+                Bitmaps     → franja_pico, zona_arbitraje_optima,
+                              alerta_critica, flag_gasto_cero (np.packbits)
+Planificador:   El rango más selectivo (fecha o RO) define los candidatos
+                (slice del índice ordenado, sin copia); el resto de
+                predicados se evalúa solo sobre esos k candidatos → O(log N + k).
+                Solo banderas → AND de bitmaps empaquetados (N/8 bytes).
+Resultado:      Posiciones (ascendentes salvo ordenar=False, que retorna el
+                slice del índice tal cual); `vista` materializa sin copia
+                cuando son consecutivas y ascendentes (slice iloc) y con
+                take() en otro caso.
+Ejecución:      python src/consultas.py   (benchmark a 2·10⁶ jornadas)
+================================================================================
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from main import RO_OPTIMO_MIN, RO_OPTIMO_MAX, RO_CRITICO, PROCESSED_PATH
+
+BANDERAS = ['franja_pico', 'zona_arbitraje_optima', 'alerta_critica', 'flag_gasto_cero']
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 1: CONSTRUCCIÓN DE ÍNDICES
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _dias(fechas) -> np.ndarray:
+    """'AAAA-MM-DD' (escalar o array) → días desde epoch (int64)."""
+    return np.asarray(fechas, dtype='datetime64[D]').astype(np.int64)
+
+
+def construir_indices(df: pd.DataFrame) -> dict:
+    """Índices ordenados por fecha y RO + bitmaps de las banderas DSS."""
+    dias = _dias(df['fecha'].astype(str).to_numpy())
+    ro   = df['ratio_optimizacion'].to_numpy(dtype=float)
+    orden_fecha = np.argsort(dias, kind='stable')
+    orden_ro    = np.argsort(ro, kind='stable')
+    banderas = {col: df[col].to_numpy(dtype=np.uint8) for col in BANDERAS}
+    return {
+        'df':            df,
+        'n':             len(df),
+        'dias':          dias,
+        'ro':            ro,
+        'orden_fecha':   orden_fecha,
+        'dias_ordenados': dias[orden_fecha],
+        'orden_ro':      orden_ro,
+        'ro_ordenado':   ro[orden_ro],
+        'banderas':      banderas,
+        'bitmaps':       {col: np.packbits(v.astype(bool)) for col, v in banderas.items()},
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 2: BÚSQUEDAS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _limites_fecha(desde, hasta) -> tuple:
+    lo = _dias(desde) if desde is not None else np.iinfo(np.int64).min
+    hi = _dias(hasta) if hasta is not None else np.iinfo(np.int64).max
+    return lo, hi
+
+
+def rango_fecha(idx: dict, desde: str = None, hasta: str = None) -> np.ndarray:
+    """Posiciones con desde ≤ fecha ≤ hasta · slice del índice ordenado (sin copia)."""
+    lo, hi = _limites_fecha(desde, hasta)
+    a = np.searchsorted(idx['dias_ordenados'], lo, side='left')
+    b = np.searchsorted(idx['dias_ordenados'], hi, side='right')
+    return idx['orden_fecha'][a:b]
+
+
+def rango_ro(idx: dict, ro_min: float = -np.inf, ro_max: float = np.inf) -> np.ndarray:
+    """Posiciones con ro_min ≤ RO ≤ ro_max · slice del índice ordenado (sin copia)."""
+    a = np.searchsorted(idx['ro_ordenado'], ro_min, side='left')
+    b = np.searchsorted(idx['ro_ordenado'], ro_max, side='right')
+    return idx['orden_ro'][a:b]
+
+
+def consultar(idx: dict, fecha: tuple = None, ro: tuple = None,
+              ordenar: bool = True, **banderas) -> np.ndarray:
+    """
+    Posiciones que cumplen todos los predicados:
+      fecha=(desde, hasta)   ro=(min, max)   <bandera>=0|1
+    Extremos None → abierto. Ejemplo:
+      consultar(idx, ro=(RO_OPTIMO_MIN, RO_OPTIMO_MAX), flag_gasto_cero=0)
+    ordenar=False omite el sort final: con un único rango y sin más
+    predicados se retorna directamente el slice del índice (vista, O(log N)).
+    """
+    desconocidas = set(banderas) - set(BANDERAS)
+    if desconocidas:
+        raise ValueError(f"[CONSULTA ERROR] Banderas no indexadas: {desconocidas}")
+
+    rangos = []
+    if fecha is not None:
+        rangos.append(('fecha', rango_fecha(idx, *fecha)))
+    if ro is not None:
+        ro_min = -np.inf if ro[0] is None else ro[0]
+        ro_max = np.inf if ro[1] is None else ro[1]
+        rangos.append(('ro', rango_ro(idx, ro_min, ro_max)))
+
+    if not rangos:
+        # Solo banderas → AND de bitmaps empaquetados
+        mapa = np.full((idx['n'] + 7) // 8, 0xFF, dtype=np.uint8)
+        for col, valor in banderas.items():
+            bm = idx['bitmaps'][col]
+            mapa &= bm if valor else ~bm
+        return np.flatnonzero(np.unpackbits(mapa, count=idx['n']))
+
+    # Candidatos = rango más selectivo · resto de predicados sobre k posiciones
+    rangos.sort(key=lambda r: len(r[1]))
+    _, pos = rangos[0]
+    if len(rangos) == 1 and not banderas:
+        return np.sort(pos) if ordenar else pos
+    keep = np.ones(len(pos), dtype=bool)
+    for otro, _ in rangos[1:]:
+        if otro == 'fecha':
+            lo, hi = _limites_fecha(*fecha)
+            d = idx['dias'][pos]
+            keep &= (d >= lo) & (d <= hi)
+        else:
+            r = idx['ro'][pos]
+            keep &= (r >= ro_min) & (r <= ro_max)
+    for col, valor in banderas.items():
+        keep &= idx['banderas'][col][pos] == int(valor)
+    pos = pos[keep]
+    return np.sort(pos) if ordenar else pos
+
+
+def vista(idx: dict, posiciones: np.ndarray) -> pd.DataFrame:
+    """
+    DataFrame de las posiciones (en el orden recibido) · slice iloc sin copia
+    si son consecutivas y ascendentes; take() en otro caso (p.ej. ordenar=False).
+    """
+    df = idx['df']
+    if len(posiciones) == 0:
+        return df.iloc[0:0]
+    if np.all(np.diff(posiciones) == 1):
+        a = int(posiciones[0])
+        return df.iloc[a:a + len(posiciones)]
+    return df.take(posiciones)
+
+
+def media(idx: dict, posiciones: np.ndarray, columna: str) -> float:
+    """Media de una columna sobre la selección sin materializar el DataFrame."""
+    if len(posiciones) == 0:
+        return np.nan
+    return float(idx['df'][columna].to_numpy()[posiciones].mean())
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# BENCHMARK
+# ─────────────────────────────────────────────────────────────────────────────
+
+def benchmark(df: pd.DataFrame, n_filas: int = 2_000_000, repeticiones: int = 50):
+    """Latencia de consultas típicas (dashboard, SQL §5 y §9) vs máscaras booleanas."""
+    rng = np.random.default_rng(42)
+    grande = df.iloc[rng.integers(0, len(df), n_filas)].reset_index(drop=True)
+    grande['fecha'] = (np.datetime64('2020-01-01') +
+                       np.sort(rng.integers(0, 2000, n_filas)).astype('timedelta64[D]')).astype(str)
+    grande['ratio_optimizacion'] = rng.normal(1.7, 0.15, n_filas).round(4)
+
+    t0 = time.perf_counter()
+    idx = construir_indices(grande)
+    print(f"  Índices construidos: {n_filas:,} jornadas en {time.perf_counter() - t0:.2f}s")
+
+    casos = {
+        'Zona óptima (RO)':          dict(ro=(RO_OPTIMO_MIN, RO_OPTIMO_MAX)),
+        'Crítica + gasto>0':         dict(ro=(RO_CRITICO, None), flag_gasto_cero=0),
+        'Mes de fechas':             dict(fecha=('2023-03-01', '2023-03-31')),
+        'Mes + óptima + PICO':       dict(fecha=('2023-03-01', '2023-03-31'),
+                                          ro=(RO_OPTIMO_MIN, RO_OPTIMO_MAX), franja_pico=1),
+        'Zona óptima (sin ordenar)': dict(ro=(RO_OPTIMO_MIN, RO_OPTIMO_MAX), ordenar=False),
+        'Solo banderas (PICO∧gasto)': dict(franja_pico=1, flag_gasto_cero=0),
+    }
+    ro_col = grande['ratio_optimizacion']
+    for nombre, kwargs in casos.items():
+        t0 = time.perf_counter()
+        for _ in range(repeticiones):
+            pos = consultar(idx, **kwargs)
+        t_idx = (time.perf_counter() - t0) / repeticiones * 1000
+        print(f"    {nombre:<28}{len(pos):>9,} filas · {t_idx:8.3f} ms")
+    t0 = time.perf_counter()
+    for _ in range(repeticiones // 10):
+        grande.loc[(ro_col >= RO_OPTIMO_MIN) & (ro_col <= RO_OPTIMO_MAX)]
+    t_mask = (time.perf_counter() - t0) / (repeticiones // 10) * 1000
+    print(f"    {'Referencia: máscara df.loc':<28}{'':>9} {'':6}  {t_mask:8.3f} ms")
+
+
+if __name__ == '__main__':
+    benchmark(pd.read_csv(PROCESSED_PATH, dtype={'fecha': str}))
@@ -0,0 +1,344 @@
+"""
+================================================================================
+FIGURAS TUFTE v1.2 — CONSTRUCCIÓN DESACOPLADA DE STREAMLIT
+Sistema de Soporte a la Decisión · DiDi Food · San Cristóbal Sur, Bogotá D.C.
+================================================================================
+Objetivo:       Toda la lógica de figuras y métricas del DSS sin llamadas st.*
+                → reutilizable por app_copiloto.py (con caché) y por procesos
+                headless (reportes por lotes).
+Partición:      Estáticas (dependen solo del dataset):
+                  KPIs · Tab 1 asimetría · Tab 3 base · Tab 4 raincloud ·
+                  contexto histórico · Tab 2 base (HOPs, depende de n_hops)
+                Dinámicas (dependen de las entradas del sidebar):
+                  estrella de proyección (Tab 2) · línea RO hoy (Tab 3)
+Serialización:  Las estáticas se serializan con fig.to_json(); cada rerun las
+                decodifica a dict con json.loads (copia fresca, sin la
+                validación de go.Figure) y las capas dinámicas se agregan
+                directamente sobre el dict. st.plotly_chart y go.Figure
+                aceptan el dict tal cual.
+================================================================================
+"""
+
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+try:
+    from main import BETA_PEDIDO, SIGMA_RESIDUAL, INTERCEPTO
+    from main import RO_OPTIMO_MIN, RO_OPTIMO_MAX, RO_CRITICO
+except ImportError:
+    BETA_PEDIDO    = 14_940
+    SIGMA_RESIDUAL = 51_320
+    INTERCEPTO     = -54_378
+    RO_OPTIMO_MIN  = 1.73
+    RO_OPTIMO_MAX  = 1.84
+    RO_CRITICO     = 2.00
+
+# ─── Paleta Tufte ────────────────────────────────────────────────────────────
+COLOR_GRIS   = '#D3D3D3'
+COLOR_VERDE  = '#2ECC71'
+COLOR_ROJO   = '#E74C3C'
+COLOR_AZUL   = '#3498DB'
+COLOR_TEXTO  = '#2C3E50'
+BG_DARK      = '#0E1117'
+
+PEDIDOS_RANGE = np.linspace(1, 25, 50)
+
+
+def version_dataset(df: pd.DataFrame) -> str:
+    """Huella del dataset procesado · clave de caché de las figuras estáticas."""
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes()).hexdigest()[:16]
+
+
+def serializar(fig: go.Figure) -> str:
+    return fig.to_json()
+
+
+def deserializar(fig_json: str) -> dict:
+    """Figura como dict plano (data/layout) · ~40× más rápido que plotly.io.from_json."""
+    return json.loads(fig_json)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ESTÁTICAS — MÉTRICAS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def calcular_kpis(df: pd.DataFrame) -> dict:
+    """KPIs de la zona superior del patrón Z."""
+    validos = df['flag_gasto_cero'] == 0
+    km_fantasma = round(df['km_fantasma'].sum(), 1)
+    return {
+        'n_total':     len(df),
+        'n_valido':    int(validos.sum()),
+        'roi_periodo': round(df.loc[validos, 'utilidad_neta'].sum() /
+                             df.loc[validos, 'gastos_operativos'].sum() * 100, 2),
+        'ro_media':    round(df['ratio_optimizacion'].mean(), 3),
+        'ro_mediana':  round(df['ratio_optimizacion'].median(), 3),
+        'km_fantasma': km_fantasma,
+        'pct_fantasma': round(km_fantasma / df['km_google'].sum() * 100, 1),
+        'prop_bono':   round(df['complemento_bono'].sum() / df['garantizado_meta'].sum() * 100, 1),
+    }
+
+
+def calcular_contexto(df: pd.DataFrame) -> dict:
+    """Contexto histórico del panel inferior (conteos por zona y franja)."""
+    n_total = len(df)
+    ctx = {'n_total': n_total}
+    for clave, col in (('optimas', 'zona_arbitraje_optima'),
+                       ('criticas', 'alerta_critica'),
+                       ('pico', 'franja_pico')):
+        n = int(df[col].sum())
+        ctx[clave] = n
+        ctx[f'pct_{clave}'] = round(n / n_total * 100, 1)
+    return ctx
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ESTÁTICAS — FIGURAS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def figura_asimetria(df: pd.DataFrame) -> go.Figure:
+    """Tab 1: km reales vs km percibidos por jornada."""
+    ro_media = round(df['ratio_optimizacion'].mean(), 3)
+    fig1 = go.Figure()
+    jornadas = list(range(len(df)))
+    fig1.add_trace(go.Scatter(
+        x=jornadas, y=df['km_google'],
+        name='km Reales (Google Maps)', line=dict(color=COLOR_GRIS, width=2),
+        fill=None
+    ))
+    fig1.add_trace(go.Scatter(
+        x=jornadas, y=df['km_didi'],
+        name=f"km Percibidos (DiDi · RO={ro_media:.3f}x)",
+        line=dict(color=COLOR_AZUL, width=2.5),
+        fill='tonexty', fillcolor='rgba(52,152,219,0.15)'
+    ))
+    fig1.update_layout(
+        title=dict(
+            text=f"La asimetría algorítmica genera {round(df['km_fantasma'].sum()/df['km_google'].sum()*100,1)}% de distancia fantasma",
+            font=dict(size=14, color=COLOR_TEXTO)
+        ),
+        xaxis_title="Jornada Operativa",
+        yaxis_title="Kilómetros",
+        plot_bgcolor='white', paper_bgcolor='white',
+        showlegend=True, legend=dict(x=0.01, y=0.99),
+        yaxis=dict(rangemode='tozero'),
+        xaxis=dict(showgrid=False),
+    )
+    fig1.update_xaxes(showgrid=False)
+    fig1.update_yaxes(showgrid=False, zeroline=True, zerolinewidth=1)
+    # Anotaciones directas Tufte
+    fig1.add_annotation(
+        x=0.02, y=0.95, xref='paper', yref='paper',
+        text=f"km Reales: {round(df['km_google'].sum()):,} km",
+        showarrow=False, font=dict(color=COLOR_GRIS, size=11)
+    )
+    fig1.add_annotation(
+        x=0.02, y=0.88, xref='paper', yref='paper',
+        text=f"km Percibidos: {round(df['km_didi'].sum()):,} km",
+        showarrow=False, font=dict(color=COLOR_AZUL, size=11)
+    )
+    fig1.add_annotation(
+        x=0.02, y=0.81, xref='paper', yref='paper',
+        text=f"km Fantasma: {round(df['km_fantasma'].sum()):,} km",
+        showarrow=False, font=dict(color=COLOR_ROJO, size=11, weight='bold')
+    )
+    return fig1
+
+
+def figura_hops_base(df: pd.DataFrame, n_hops: int) -> go.Figure:
+    """Tab 2 sin proyección: trayectorias HOPs, recta OLS, banda IC 90% e históricos."""
+    # HOPs: trayectorias de regresión con σ residual (semilla fija → reproducible)
+    rng = np.random.RandomState(42)
+    hops_matrix = np.array([
+        BETA_PEDIDO * PEDIDOS_RANGE + INTERCEPTO + rng.normal(0, SIGMA_RESIDUAL, 50)
+        for _ in range(n_hops)
+    ])
+    fig2 = go.Figure()
+    # Trazar HOPs (líneas grises semitransparentes)
+    for i in range(n_hops):
+        fig2.add_trace(go.Scatter(
+            x=PEDIDOS_RANGE, y=hops_matrix[i],
+            mode='lines', line=dict(color='rgba(200,200,200,0.3)', width=1),
+            showlegend=False, hoverinfo='skip'
+        ))
+    # Línea media OLS
+    y_media = BETA_PEDIDO * PEDIDOS_RANGE + INTERCEPTO
+    fig2.add_trace(go.Scatter(
+        x=PEDIDOS_RANGE, y=y_media,
+        mode='lines', name=f'y = {BETA_PEDIDO:,}x + ({INTERCEPTO:,})',
+        line=dict(color=COLOR_AZUL, width=3)
+    ))
+    # Banda IC 90%
+    y_p5  = np.percentile(hops_matrix, 5, axis=0)
+    y_p95 = np.percentile(hops_matrix, 95, axis=0)
+    fig2.add_trace(go.Scatter(
+        x=np.concatenate([PEDIDOS_RANGE, PEDIDOS_RANGE[::-1]]),
+        y=np.concatenate([y_p95, y_p5[::-1]]),
+        fill='toself', fillcolor='rgba(52,152,219,0.15)',
+        line=dict(color='rgba(0,0,0,0)'),
+        name='IC 90% (HOPs)',
+        showlegend=True
+    ))
+    # Puntos del dataset histórico
+    fig2.add_trace(go.Scatter(
+        x=df['pedidos_fisicos'], y=df['utilidad_neta'],
+        mode='markers', name='Jornadas históricas',
+        marker=dict(color=COLOR_AZUL, size=8, opacity=0.7,
+                    line=dict(color='white', width=1))
+    ))
+    fig2.update_layout(
+        xaxis_title="Pedidos Físicos Completados",
+        yaxis_title="Utilidad Neta (COP)",
+        plot_bgcolor='white', paper_bgcolor='white',
+        yaxis=dict(rangemode='tozero', tickprefix='$', tickformat=','),
+        xaxis=dict(showgrid=False),
+    )
+    fig2.update_yaxes(showgrid=False)
+    fig2.update_xaxes(showgrid=False)
+    return fig2
+
+
+def figura_quiebre_ro_base(df: pd.DataFrame) -> go.Figure:
+    """Tab 3 sin la línea del RO de hoy: zonas, umbral crítico y eficiencia por jornada."""
+    fig3 = go.Figure()
+    # Zona óptima (sombreado verde)
+    fig3.add_vrect(
+        x0=RO_OPTIMO_MIN, x1=RO_OPTIMO_MAX,
+        fillcolor="rgba(46,204,113,0.15)", line_width=0,
+        annotation_text="Zona Óptima", annotation_position="top left",
+        annotation_font_color=COLOR_VERDE
+    )
+    # Línea umbral crítico
+    fig3.add_vline(x=RO_CRITICO, line_dash='dash', line_color=COLOR_ROJO,
+                   annotation_text="Umbral Crítico (RO=2.0)",
+                   annotation_font_color=COLOR_ROJO)
+    # Scatter por zona
+    colores_zona = df['ratio_optimizacion'].apply(
+        lambda r: COLOR_VERDE if RO_OPTIMO_MIN <= r <= RO_OPTIMO_MAX
+                  else (COLOR_ROJO if r >= RO_CRITICO else COLOR_GRIS)
+    )
+    fig3.add_trace(go.Scatter(
+        x=df['ratio_optimizacion'], y=df['eficiencia_cumplimiento'],
+        mode='markers',
+        marker=dict(color=colores_zona, size=10, opacity=0.85,
+                    line=dict(color='white', width=1)),
+        text=[f"RO={r:.2f} · Efic={e:.2%}" for r, e in
+              zip(df['ratio_optimizacion'], df['eficiencia_cumplimiento'])],
+        hoverinfo='text', showlegend=False
+    ))
+    # Anotaciones eficiencia por zona
+    ef_opt  = df.loc[(df['ratio_optimizacion']>=RO_OPTIMO_MIN) & (df['ratio_optimizacion']<=RO_OPTIMO_MAX), 'eficiencia_cumplimiento'].mean()
+    ef_crit = df.loc[df['ratio_optimizacion']>=RO_CRITICO, 'eficiencia_cumplimiento'].mean()
+    if not np.isnan(ef_opt):
+        fig3.add_annotation(x=1.785, y=1.05, text=f"Efic. Óptima: {ef_opt:.1%}",
+                            showarrow=False, font=dict(color=COLOR_VERDE, size=11))
+    if not np.isnan(ef_crit):
+        fig3.add_annotation(x=2.15, y=1.05, text=f"Efic. Crítica: {ef_crit:.1%}",
+                            showarrow=False, font=dict(color=COLOR_ROJO, size=11))
+    fig3.update_layout(
+        title="Punto de Quiebre: La eficiencia colapsa cuando el RO supera 2.0",
+        xaxis_title="Ratio de Optimización (RO = km_didi / km_google)",
+        yaxis_title="Eficiencia de Cumplimiento",
+        plot_bgcolor='white', paper_bgcolor='white',
+        yaxis=dict(tickformat='.0%', rangemode='tozero'),
+        xaxis=dict(showgrid=False),
+    )
+    fig3.update_yaxes(showgrid=False)
+    return fig3
+
+
+def figura_raincloud_roi(df: pd.DataFrame) -> go.Figure:
+    """Tab 4: distribución del ROI diario (N válido) con la brecha de integridad."""
+    roi_vals  = df['roi_diario'].dropna()
+    n_nan     = df['roi_diario'].isna().sum()
+    roi_medio = round(roi_vals.mean(), 2)
+    roi_med   = round(roi_vals.median(), 2)
+    fig4 = go.Figure()
+    # Strip plot (puntos individuales) · jitter con semilla fija → figura estable
+    jitter = np.random.RandomState(0).uniform(-0.05, 0.05, len(roi_vals))
+    fig4.add_trace(go.Scatter(
+        x=roi_vals, y=jitter - 0.3,
+        mode='markers', name='Jornadas individuales',
+        marker=dict(color=COLOR_AZUL, size=8, opacity=0.6,
+                    line=dict(color='white', width=1))
+    ))
+    # Boxplot (la mediana se marca con la línea roja de abajo)
+    fig4.add_trace(go.Box(
+        x=roi_vals, y0=0, name='Distribución ROI',
+        boxpoints=False, line=dict(color=COLOR_GRIS, width=1.5),
+        fillcolor='rgba(200,200,200,0.3)'
+    ))
+    # Línea mediana
+    fig4.add_vline(x=roi_med, line_dash='dash', line_color=COLOR_ROJO,
+                   annotation_text=f"Mediana: {roi_med:.1f}%",
+                   annotation_font_color=COLOR_ROJO)
+    # Anotación Brecha de Integridad
+    fig4.add_annotation(
+        x=roi_vals.max() * 0.75, y=0.35,
+        text=f"⚠ Brecha de Integridad: {n_nan} jornadas<br>(Gasto $0 → ROI = NaN)",
+        showarrow=False,
+        bgcolor='rgba(231,76,60,0.15)', bordercolor=COLOR_ROJO,
+        font=dict(color=COLOR_ROJO, size=11)
+    )
+    fig4.update_layout(
+        title=f"ROI auditado: {roi_medio:.2f}% (media) · {roi_med:.2f}% (mediana) · N válido={len(roi_vals)}",
+        xaxis_title="ROI Diario (%)",
+        yaxis=dict(visible=False, range=[-0.6, 0.6]),
+        plot_bgcolor='white', paper_bgcolor='white',
+        xaxis=dict(rangemode='tozero', showgrid=False),
+        showlegend=False
+    )
+    return fig4
+
+
+def construir_estaticas(df: pd.DataFrame) -> dict:
+    """Todo lo que no depende de las entradas del sidebar, serializado."""
+    return {
+        'kpis':     calcular_kpis(df),
+        'contexto': calcular_contexto(df),
+        'fig1':     serializar(figura_asimetria(df)),
+        'fig3':     serializar(figura_quiebre_ro_base(df)),
+        'fig4':     serializar(figura_raincloud_roi(df)),
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# DINÁMICAS — CAPAS DEPENDIENTES DE LAS ENTRADAS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def agregar_proyeccion(fig2: dict, pedidos: int, utilidad: int, factor_ef: float) -> dict:
+    """Tab 2: estrella roja de la proyección de hoy + título."""
+    fig2['data'].append({
+        'type': 'scatter', 'x': [pedidos], 'y': [utilidad],
+        'mode': 'markers+text', 'name': 'Proyección hoy',
+        'marker': {'color': COLOR_ROJO, 'size': 14, 'symbol': 'star',
+                   'line': {'color': 'white', 'width': 2}},
+        'text': [f'${utilidad:,}'], 'textposition': 'top center',
+        'textfont': {'color': COLOR_ROJO, 'size': 12},
+    })
+    fig2['layout']['title'] = {
+        'text': f"pedidos_fisicos={pedidos} → utilidad esperada: ${utilidad:,} COP (ajuste eficiencia: {factor_ef})",
+        'font': {'size': 13},
+    }
+    return fig2
+
+
+def agregar_linea_ro(fig3: dict, ro: float) -> dict:
+    """Tab 3: línea punteada del RO ingresado (equivalente a add_vline)."""
+    layout = fig3['layout']
+    layout.setdefault('shapes', []).append({
+        'type': 'line', 'x0': ro, 'x1': ro, 'xref': 'x',
+        'y0': 0, 'y1': 1, 'yref': 'y domain',
+        'line': {'color': COLOR_AZUL, 'dash': 'dot'},
+    })
+    layout.setdefault('annotations', []).append({
+        'x': ro, 'xref': 'x', 'y': 1, 'yref': 'y domain',
+        'text': f"RO hoy: {ro:.2f}", 'showarrow': False,
+        'xanchor': 'left', 'yanchor': 'top',
+        'font': {'color': COLOR_AZUL},
+    })
+    return fig3
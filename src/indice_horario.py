@@ -0,0 +1,171 @@
+"""
+================================================================================
+ÍNDICE HORARIO v1.2 — EXPOSICIÓN POR HORA DEL DÍA (PICO/VALLE)
+Sistema de Soporte a la Decisión · DiDi Food · San Cristóbal Sur, Bogotá D.C.
+================================================================================
+Problema:       franja_pico se decide solo por h_inicio → la jornada
+                13:34→23:56 cubre las 4 horas PICO y queda etiquetada VALLE.
+Índice:         Cada jornada se reparte sobre las 24 horas del día según el
+                solapamiento de [h_inicio, h_fin) con cada hora (vectorizado,
+                con cruce de medianoche). Utilidad, pedidos y km se atribuyen
+                en proporción a las horas expuestas.
+Consulta:       Agregados por hora + sumas prefijas → cualquier ventana
+                [h_ini, h_fin) (incluso 22→02) en O(1), sin recorrer jornadas.
+Salida:         data/processed/indice_horario.npz
+Ejecución:      python src/indice_horario.py
+================================================================================
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from main import tiempo_a_minutos, PICO_INICIO, PICO_FIN, PROCESSED_PATH, BASE_DIR
+
+INDICE_HORARIO_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'indice_horario.npz')
+METRICAS_ATRIBUIBLES = ['utilidad_neta', 'pedidos_fisicos', 'km_google', 'km_didi', 'gastos_operativos']
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 1: EXPOSICIÓN POR HORA
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _minutos(horas: pd.Series) -> np.ndarray:
+    return horas.astype(str).map(tiempo_a_minutos).to_numpy(dtype=np.int32)
+
+
+def exposicion_horaria(df: pd.DataFrame) -> np.ndarray:
+    """
+    Matriz (n × 24) de horas trabajadas en cada hora del día.
+    Si h_fin < h_inicio la jornada cruzó medianoche: el tramo posterior a
+    las 24:00 se acumula en las horas 0, 1, … del mismo índice.
+    """
+    inicio = _minutos(df['h_inicio'])
+    fin    = _minutos(df['h_fin'])
+    fin    = np.where(fin < inicio, fin + 1440, fin)      # Igual que calcular_duracion_turno
+
+    expo = np.zeros((len(df), 24), dtype=np.float32)
+    for h in range(24):
+        for dia in (0, 1440):                          # Día de inicio y día siguiente
+            a = dia + 60 * h
+            solape = np.minimum(fin, a + 60) - np.maximum(inicio, a)
+            expo[:, h] += np.clip(solape, 0, 60) / 60
+    return expo
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 2: CONSTRUCCIÓN DEL ÍNDICE
+# ─────────────────────────────────────────────────────────────────────────────
+
+def construir_indice_horario(df: pd.DataFrame) -> dict:
+    """
+    Agregados por hora del día (vectores de 24) y sus sumas prefijas (25):
+      horas           horas-jornada expuestas
+      jornadas        jornadas con exposición > 0 en la hora (duración 0 → hora de inicio)
+      <métrica>       métrica atribuida ∝ exposición / duracion_horas
+    Jornadas de duración 0 (h_fin == h_inicio) atribuyen sus métricas completas
+    a la hora de inicio para no perderlas de los totales.
+    También conserva la matriz de exposición por jornada.
+    """
+    expo = exposicion_horaria(df)
+    duracion = expo.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        peso = np.where(duracion[:, None] > 0, expo / duracion[:, None], 0.0)
+    sin_duracion = np.flatnonzero(duracion == 0)
+    peso[sin_duracion, _minutos(df['h_inicio'])[sin_duracion] // 60 % 24] = 1.0
+
+    indice = {
+        'exposicion': expo,
+        'fecha':      df['fecha'].to_numpy(dtype=str),
+        'h_inicio':   df['h_inicio'].to_numpy(dtype=str),
+        'horas':      expo.sum(axis=0, dtype=float),
+        'jornadas':   (peso > 0).sum(axis=0).astype(float),
+    }
+    for col in METRICAS_ATRIBUIBLES:
+        indice[col] = df[col].to_numpy(dtype=float) @ peso
+    for clave in ['horas', 'jornadas'] + METRICAS_ATRIBUIBLES:
+        indice[f'p_{clave}'] = np.concatenate([[0.0], np.cumsum(indice[clave])])
+    return indice
+
+
+def guardar_indice(indice: dict, path: str = INDICE_HORARIO_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez_compressed(path, **indice)
+    print(f"  ✓ Índice horario exportado: {path}")
+
+
+def cargar_indice(path: str = INDICE_HORARIO_PATH) -> dict:
+    with np.load(path, allow_pickle=False) as datos:
+        return {k: datos[k] for k in datos.files}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 3: CONSULTAS O(1)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _suma_ventana(indice: dict, clave: str, h_ini: int, h_fin: int) -> float:
+    """
+    Σ de la métrica en [h_ini, h_fin) · ventanas que cruzan medianoche se
+    parten en dos · h_ini == h_fin es la ventana vacía.
+    """
+    p = indice[f'p_{clave}']
+    if h_ini == h_fin:
+        return 0.0
+    if h_ini < h_fin:
+        return float(p[h_fin] - p[h_ini])
+    return float((p[24] - p[h_ini]) + p[h_fin])
+
+
+def consultar_ventana(indice: dict, h_ini: int = PICO_INICIO, h_fin: int = PICO_FIN) -> dict:
+    """Analítica de una ventana horaria: horas, utilidad/hora, RO y pedidos/hora."""
+    sumas = {c: _suma_ventana(indice, c, h_ini, h_fin)
+             for c in ['horas'] + METRICAS_ATRIBUIBLES}
+    horas = sumas['horas']
+    return {
+        'ventana':            f"[{h_ini:02d}:00, {h_fin:02d}:00)",
+        'horas_expuestas':    round(horas, 2),
+        'utilidad_atribuida': round(sumas['utilidad_neta'], 0),
+        'utilidad_por_hora':  round(sumas['utilidad_neta'] / horas, 2) if horas else np.nan,
+        'pedidos_por_hora':   round(sumas['pedidos_fisicos'] / horas, 3) if horas else np.nan,
+        'ro':                 round(sumas['km_didi'] / sumas['km_google'], 4) if sumas['km_google'] else np.nan,
+    }
+
+
+def tabla_horaria(indice: dict) -> pd.DataFrame:
+    """24 filas (hora del día) con exposición y métricas por hora trabajada."""
+    horas = indice['horas']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return pd.DataFrame({
+            'hora':              np.arange(24),
+            'jornadas':          indice['jornadas'].astype(int),
+            'horas_expuestas':   horas.round(2),
+            'utilidad_por_hora': (indice['utilidad_neta'] / horas).round(2),
+            'pedidos_por_hora':  (indice['pedidos_fisicos'] / horas).round(3),
+            'ro':                (indice['km_didi'] / indice['km_google']).round(4),
+        })
+
+
+def exposicion_pico(indice: dict, h_ini: int = PICO_INICIO, h_fin: int = PICO_FIN) -> np.ndarray:
+    """Horas de cada jornada dentro de la ventana PICO (alternativa continua a franja_pico)."""
+    horas = np.arange(24)
+    en_ventana = (horas >= h_ini) & (horas < h_fin) if h_ini <= h_fin else \
+                 (horas >= h_ini) | (horas < h_fin)
+    return indice['exposicion'][:, en_ventana].sum(axis=1)
+
+
+if __name__ == '__main__':
+    df = pd.read_csv(PROCESSED_PATH, dtype={'fecha': str, 'h_inicio': str, 'h_fin': str})
+    indice = construir_indice_horario(df)
+    guardar_indice(indice)
+    print(tabla_horaria(indice).to_string(index=False))
+    pico  = consultar_ventana(indice, PICO_INICIO, PICO_FIN)
+    valle = consultar_ventana(indice, PICO_FIN, PICO_INICIO)
+    print(f"\n  PICO  {pico['ventana']}: {pico['horas_expuestas']} h · "
+          f"${pico['utilidad_por_hora']:,}/h · RO={pico['ro']}")
+    print(f"  VALLE {valle['ventana']}: {valle['horas_expuestas']} h · "
+          f"${valle['utilidad_por_hora']:,}/h · RO={valle['ro']}")
+    n_mal = int(((exposicion_pico(indice) > 0) & (df['franja_pico'] == 0)).sum())
+    print(f"  Jornadas VALLE (por h_inicio) con exposición PICO: {n_mal}/{len(df)}")
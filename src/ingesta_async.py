@@ -0,0 +1,238 @@
+"""
+================================================================================
+INGESTA ASÍNCRONA MULTI-FUENTE v1.2 — Google Maps ⨝ DiDi App
+Sistema de Soporte a la Decisión · DiDi Food · San Cristóbal Sur, Bogotá D.C.
+================================================================================
+Entrada:        Exportaciones separadas por conductor y fuente:
+                  <conductor>_google.csv  → fecha,h_inicio,h_fin,km_google_maps
+                  <conductor>_didi.csv    → fecha,h_inicio,h_fin,km_didi_app,
+                                            ingreso_bruto,pedidos_cohete,
+                                            pedidos_normales,gasto_extra
+                Origen: directorio local o URLs http(s) (p.ej. servidor local
+                `python -m http.server` como stand-in del API de exportación).
+Unión:          (fecha, h_inicio) → una fila por jornada con el esquema crudo
+                de 9 columnas que valida `cargar_datos_crudos`.
+Backpressure:   asyncio.Queue acotada entre lectores y consumidor · los
+                conductores en vuelo se limitan con un semáforo.
+Fallos:         El primer error (lectura, unión o transformación de un
+                bloque) cancela lectores y consumidor y se propaga; los demás
+                errores se reportan · nunca queda un put() colgado.
+                Compatible con Python 3.8 (gather + cancel, sin TaskGroup).
+Salida:         data/processed/didi_flota_v1.2.csv (con columna conductor);
+                el dataset de un conductor (didi_procesado_v1.1.csv) no se toca.
+Ejecución:      python src/ingesta_async.py <directorio | url ...>
+================================================================================
+"""
+
+import asyncio
+import io
+import os
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from main import (
+    validar_esquema_crudo, transformar_crudo, calcular_invariantes,
+    exportar_procesado, imprimir_reporte, FLOTA_PATH
+)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PARÁMETROS DE INGESTA
+# ─────────────────────────────────────────────────────────────────────────────
+FUENTES            = ('google', 'didi')
+CLAVE_JORNADA      = ['fecha', 'h_inicio']
+MAX_CONCURRENCIA   = 16    # Conductores en vuelo (2 lecturas c/u: archivo o HTTP)
+TAMANO_COLA        = 8     # Jornadas unidas en espera del consumidor
+TIMEOUT_HTTP       = 30    # Segundos por petición
+
+COLUMNAS_GOOGLE = ['fecha', 'h_inicio', 'h_fin', 'km_google_maps']
+COLUMNAS_DIDI   = ['fecha', 'h_inicio', 'h_fin', 'km_didi_app', 'ingreso_bruto',
+                   'pedidos_cohete', 'pedidos_normales', 'gasto_extra']
+
+_FIN = object()   # Centinela de fin de cola
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 1: DESCUBRIMIENTO DE FUENTES
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _parsear_nombre(origen: str) -> tuple:
+    """'.../rider07_google.csv' → ('rider07', 'google'). Error si no cumple el patrón."""
+    nombre = os.path.basename(origen.rstrip('/').split('?')[0])
+    base, ext = os.path.splitext(nombre)
+    conductor, _, fuente = base.rpartition('_')
+    if ext.lower() != '.csv' or not conductor or fuente not in FUENTES:
+        raise ValueError(f"[INGESTA ERROR] Nombre no reconocido: {nombre} "
+                         f"(esperado <conductor>_{{{'|'.join(FUENTES)}}}.csv)")
+    return conductor, fuente
+
+
+def descubrir_fuentes(origenes: list) -> dict:
+    """
+    Agrupa los orígenes por conductor: {conductor: {'google': uri, 'didi': uri}}.
+    Un directorio se expande a todos sus *.csv; las URLs se usan tal cual.
+    """
+    uris = []
+    for origen in origenes:
+        if os.path.isdir(origen):
+            uris.extend(os.path.join(origen, f) for f in sorted(os.listdir(origen))
+                        if f.lower().endswith('.csv'))
+        else:
+            uris.append(origen)
+
+    agrupado = defaultdict(dict)
+    for uri in uris:
+        conductor, fuente = _parsear_nombre(uri)
+        agrupado[conductor][fuente] = uri
+
+    incompletos = sorted(c for c, f in agrupado.items() if set(f) != set(FUENTES))
+    if incompletos:
+        raise ValueError(f"[INGESTA ERROR] Conductores sin ambas fuentes: {incompletos}")
+    return dict(agrupado)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 2: LECTURA CONCURRENTE
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _leer_csv(uri: str) -> pd.DataFrame:
+    """Lectura bloqueante (archivo local o HTTP) · se ejecuta en un hilo."""
+    dtype = {'fecha': str, 'h_inicio': str, 'h_fin': str}
+    if uri.startswith(('http://', 'https://')):
+        with urllib.request.urlopen(uri, timeout=TIMEOUT_HTTP) as resp:
+            return pd.read_csv(io.BytesIO(resp.read()), dtype=dtype)
+    return pd.read_csv(uri, dtype=dtype)
+
+
+async def _leer_fuente(uri: str, columnas: list) -> pd.DataFrame:
+    df = await asyncio.get_running_loop().run_in_executor(None, _leer_csv, uri)
+    faltantes = set(columnas) - set(df.columns)
+    if faltantes:
+        raise ValueError(f"[INGESTA ERROR] Columnas faltantes en {uri}: {faltantes}")
+    df = df[columnas].copy()
+    # Normaliza la clave de unión igual que procesar_dimension_tiempo
+    for col in ('h_inicio', 'h_fin'):
+        df[col] = df[col].astype(str).str.strip().str.zfill(5)
+    df['fecha'] = df['fecha'].astype(str).str.strip()
+    return df
+
+
+def unir_fuentes(df_google: pd.DataFrame, df_didi: pd.DataFrame,
+                 conductor: str = None) -> pd.DataFrame:
+    """
+    Une km Google y km DiDi por jornada (fecha, h_inicio).
+    h_fin se toma de DiDi (cierre de sesión en la app); las jornadas presentes
+    en una sola fuente se descartan y se reportan — no se imputan km.
+    """
+    try:
+        df = df_didi.merge(
+            df_google.drop(columns='h_fin'), on=CLAVE_JORNADA,
+            how='inner', validate='one_to_one'
+        )
+    except pd.errors.MergeError as e:
+        raise ValueError(f"[INGESTA ERROR] {conductor or '?'}: jornadas duplicadas "
+                         f"por (fecha, h_inicio) en una fuente") from e
+    descartadas = len(df_google) + len(df_didi) - 2 * len(df)
+    if descartadas:
+        print(f"  ⚠  {conductor or '?'}: {descartadas} registros sin par Google/DiDi (descartados)")
+    if conductor is not None:
+        df.insert(0, 'conductor', conductor)
+    return validar_esquema_crudo(df)
+
+
+async def _productor(conductor: str, fuentes: dict, cola: asyncio.Queue,
+                     semaforo: asyncio.Semaphore):
+    # El permiso se libera solo tras put(): con la cola llena, los lectores en
+    # vuelo esperan al consumidor y no se inician lecturas nuevas.
+    async with semaforo:
+        df_google, df_didi = await asyncio.gather(
+            _leer_fuente(fuentes['google'], COLUMNAS_GOOGLE),
+            _leer_fuente(fuentes['didi'],   COLUMNAS_DIDI),
+        )
+        await cola.put(unir_fuentes(df_google, df_didi, conductor))
+
+
+async def _consumidor(cola: asyncio.Queue, bloques: list):
+    while True:
+        df = await cola.get()
+        if df is _FIN:
+            break
+        try:
+            bloques.append(transformar_crudo(df))
+        except Exception as e:
+            conductor = df['conductor'].iat[0] if 'conductor' in df.columns and len(df) else '?'
+            raise ValueError(f"[INGESTA ERROR] {conductor}: bloque no transformable "
+                             f"({type(e).__name__}: {e})") from e
+
+
+async def _cerrar_cola(productores: list, cola: asyncio.Queue):
+    """Centinela de fin cuando todos los lectores entregaron su bloque."""
+    await asyncio.gather(*productores)
+    await cola.put(_FIN)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 3: ORQUESTACIÓN
+# ─────────────────────────────────────────────────────────────────────────────
+
+async def ingerir_async(origenes: list,
+                        max_concurrencia: int = MAX_CONCURRENCIA,
+                        tamano_cola: int = TAMANO_COLA) -> pd.DataFrame:
+    """
+    Lee todas las fuentes en paralelo, une por jornada y transforma cada bloque
+    (uno por conductor) con el pipeline ETL a medida que llega.
+    Retorna el DataFrame transformado (columna extra: conductor).
+    El primer fallo cancela lectores y consumidor y se relanza tal cual.
+    """
+    fuentes  = descubrir_fuentes(origenes)
+    cola     = asyncio.Queue(maxsize=tamano_cola)
+    semaforo = asyncio.Semaphore(max_concurrencia)
+    bloques  = []
+
+    productores = [asyncio.ensure_future(_productor(c, f, cola, semaforo))
+                   for c, f in sorted(fuentes.items())]
+    tareas = [asyncio.ensure_future(_consumidor(cola, bloques)),
+              asyncio.ensure_future(_cerrar_cola(productores, cola))] + productores
+    try:
+        await asyncio.gather(*tareas)
+    except BaseException as e:
+        for tarea in tareas:
+            tarea.cancel()
+        resultados = await asyncio.gather(*tareas, return_exceptions=True)
+        otros = {id(r): r for r in resultados
+                 if isinstance(r, Exception) and r is not e}
+        for r in otros.values():
+            print(f"  ⚠  Error adicional durante la ingesta: {type(r).__name__}: {r}")
+        raise
+
+    if not bloques:
+        raise ValueError("[INGESTA ERROR] Ninguna jornada ingerida")
+    df = pd.concat(bloques, ignore_index=True)
+    return df.sort_values(['conductor', 'fecha', 'h_inicio'], ignore_index=True)
+
+
+def ejecutar_pipeline_async(origenes: list,
+                            processed_path: str = FLOTA_PATH) -> pd.DataFrame:
+    """Equivalente multi-fuente de `ejecutar_pipeline`: ingesta → invariantes → exportación."""
+    print("\n🔄 Iniciando Ingesta Asíncrona Multi-Fuente v1.2...")
+    t0 = time.perf_counter()
+    df = asyncio.run(ingerir_async(origenes))
+    t_ingesta = time.perf_counter() - t0
+    print(f"  ✓ Ingesta: {len(df)} jornadas · {df['conductor'].nunique()} conductores "
+          f"· {t_ingesta:.2f}s")
+
+    inv    = calcular_invariantes(df)
+    df_out = exportar_procesado(df, processed_path)
+    imprimir_reporte(inv)
+    return df_out
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Uso: python src/ingesta_async.py <directorio | url ...>")
+        sys.exit(1)
+    ejecutar_pipeline_async(sys.argv[1:])
@@ -22,6 +22,7 @@ import pandas as pd
 import numpy as np
 from scipy import stats
 import os
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -45,27 +46,36 @@ PICO_FIN       = 21   # Exclusivo: [17:00, 21:00)
 BASE_DIR       = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 RAW_PATH       = os.path.join(BASE_DIR, 'data', 'raw', 'didi_analisis_12_01.csv')
 PROCESSED_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'didi_procesado_v1.1.csv')
+FLOTA_PATH     = os.path.join(BASE_DIR, 'data', 'processed', 'didi_flota_v1.2.csv')
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # MÓDULO 1: INGESTA Y VALIDACIÓN
 # ─────────────────────────────────────────────────────────────────────────────
 
+ESQUEMA_CRUDO = {
+    'fecha', 'h_inicio', 'h_fin',
+    'km_google_maps', 'km_didi_app', 'ingreso_bruto',
+    'pedidos_cohete', 'pedidos_normales', 'gasto_extra'
+}
+
+
+def validar_esquema_crudo(df: pd.DataFrame) -> pd.DataFrame:
+    """Valida el esquema mínimo de 9 columnas primarias sobre un DataFrame crudo."""
+    faltantes = ESQUEMA_CRUDO - set(df.columns)
+    if faltantes:
+        raise ValueError(f"[ETL ERROR] Columnas faltantes en raw CSV: {faltantes}")
+    return df
+
+
 def cargar_datos_crudos(path: str) -> pd.DataFrame:
     """Carga el CSV crudo y valida el esquema mínimo de 9 columnas primarias."""
-    esquema_requerido = {
-        'fecha', 'h_inicio', 'h_fin',
-        'km_google_maps', 'km_didi_app', 'ingreso_bruto',
-        'pedidos_cohete', 'pedidos_normales', 'gasto_extra'
-    }
     df = pd.read_csv(path, dtype={
         'h_inicio': str,
         'h_fin': str,
         'fecha': str
     })
-    faltantes = esquema_requerido - set(df.columns)
-    if faltantes:
-        raise ValueError(f"[ETL ERROR] Columnas faltantes en raw CSV: {faltantes}")
+    validar_esquema_crudo(df)
     print(f"  ✓ Dataset cargado: {len(df)} observaciones")
     return df
 
@@ -74,7 +84,7 @@ def cargar_datos_crudos(path: str) -> pd.DataFrame:
 # MÓDULO 2: DIMENSIÓN 1 — TIEMPO E IDENTIFICACIÓN
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _tiempo_a_minutos(t: str) -> int:
+def tiempo_a_minutos(t: str) -> int:
     """Convierte string HH:MM a minutos desde medianoche. Preserva formato string."""
     t = str(t).strip().zfill(5)  # Normaliza '0:12' → '00:12'
     partes = t.split(':')
@@ -86,8 +96,8 @@ def calcular_duracion_turno(h_inicio: str, h_fin: str) -> float:
     Calcula duración en horas con tratamiento de cruce de medianoche.
     Si h_fin < h_inicio → la jornada cruzó las 00:00 → suma 1440 min.
     """
-    min_inicio = _tiempo_a_minutos(h_inicio)
-    min_fin    = _tiempo_a_minutos(h_fin)
+    min_inicio = tiempo_a_minutos(h_inicio)
+    min_fin    = tiempo_a_minutos(h_fin)
     if min_fin < min_inicio:
         min_fin += 1440   # Cruce de medianoche
     return round((min_fin - min_inicio) / 60, 2)
@@ -354,10 +364,14 @@ ORDEN_COLUMNAS_28 = [
 
 
 def exportar_procesado(df: pd.DataFrame, path: str):
-    """Exporta el dataset procesado con las 28 columnas MECE en orden canónico."""
+    """
+    Exporta el dataset procesado con las 28 columnas MECE en orden canónico.
+    Datasets de flota (ingesta_async.py) conservan `conductor` como primera columna.
+    """
     os.makedirs(os.path.dirname(path), exist_ok=True)
     # franja_pico ya está en Dimensión 1 → no duplicar en Dimensión 7
-    cols_disponibles = [c for c in ORDEN_COLUMNAS_28 if c in df.columns]
+    cols_disponibles = (['conductor'] if 'conductor' in df.columns else []) + \
+                       [c for c in ORDEN_COLUMNAS_28 if c in df.columns]
     df_out = df[cols_disponibles].copy()
     df_out.to_csv(path, index=False, float_format='%.4f')
     print(f"  ✓ Dataset procesado exportado: {path}")
@@ -369,16 +383,11 @@ def exportar_procesado(df: pd.DataFrame, path: str):
 # PIPELINE PRINCIPAL
 # ─────────────────────────────────────────────────────────────────────────────
 
-def ejecutar_pipeline(raw_path: str = RAW_PATH,
-                      processed_path: str = PROCESSED_PATH) -> pd.DataFrame:
+def transformar_crudo(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Ejecuta el pipeline completo ETL v1.2.
-    Retorna el DataFrame procesado con 28 variables MECE.
-    Recalibra todos los invariantes automáticamente ante N+1.
+    Aplica las 7 dimensiones MECE sobre un bloque crudo ya validado.
+    Todas las transformaciones son fila a fila → se puede aplicar por chunks.
     """
-    print("\n🔄 Iniciando Pipeline ETL v1.2...")
-
-    df = cargar_datos_crudos(raw_path)
     df = procesar_dimension_tiempo(df)
     df = procesar_dimension_distancia(df)
     df = separar_ingreso_mece(df)
@@ -386,13 +395,47 @@ def ejecutar_pipeline(raw_path: str = RAW_PATH,
     df = calcular_resultados(df)
     df = procesar_dimension_produccion(df)
     df = calcular_features_ro(df)
+    return df
+
+
+def ejecutar_pipeline(raw_path: str = RAW_PATH,
+                      processed_path: str = PROCESSED_PATH,
+                      trazas_dir: str = None,
+                      snapshot: bool = True) -> pd.DataFrame:
+    """
+    Ejecuta el pipeline completo ETL v1.2.
+    Retorna el DataFrame procesado con 28 variables MECE.
+    Recalibra todos los invariantes automáticamente ante N+1.
+    Si `trazas_dir` se indica, los km de las jornadas con traza GPS se
+    recalculan desde los puntos crudos (ver trazas_gps.py).
+    Con `snapshot=True` la ejecución queda versionada en data/snapshots
+    (invariantes + dataset · ver snapshots.py).
+    """
+    print("\n🔄 Iniciando Pipeline ETL v1.2...")
+
+    df = cargar_datos_crudos(raw_path)
+    if trazas_dir:
+        from trazas_gps import km_por_jornada, aplicar_km_trazas
+        df = aplicar_km_trazas(df, km_por_jornada(trazas_dir))
+    df = transformar_crudo(df)
 
     inv    = calcular_invariantes(df)
     df_out = exportar_procesado(df, processed_path)
+    if snapshot:
+        from snapshots import guardar_snapshot
+        guardar_snapshot(df_out, inv)
     imprimir_reporte(inv)
 
     return df_out
 
 
 if __name__ == '__main__':
-    ejecutar_pipeline()
+    # python src/main.py [--trazas <directorio>]  (ver trazas_gps.py)
+    trazas_dir = None
+    if '--trazas' in sys.argv:
+        i = sys.argv.index('--trazas')
+        if i + 1 >= len(sys.argv):
+            print("Uso: python src/main.py [--trazas <directorio>]")
+            sys.exit(1)
+        trazas_dir = sys.argv[i + 1]
+    ejecutar_pipeline(trazas_dir=trazas_dir)
@@ -0,0 +1,280 @@
+"""
+================================================================================
+MODELO PRESCRIPTIVO MULTIVARIADO v1.2 — OLS / RIDGE
+Sistema de Soporte a la Decisión · DiDi Food · San Cristóbal Sur, Bogotá D.C.
+================================================================================
+Especificación: utilidad_neta ~ 1 + pedidos_fisicos + ratio_optimizacion
+                               + franja_pico + duracion_horas
+                               + zona_arbitraje_optima + alerta_critica
+                Sustituye los ajustes ad-hoc del DSS (FACTOR_EFIC_CRITICA, PICO)
+                por coeficientes estimados conjuntamente.
+Estimación:     Ecuaciones normales sobre la matriz de Gram cacheada
+                (XᵀX, Xᵀy, yᵀy, n) · ridge sobre features estandarizadas.
+Recalibración:  N+1 → actualización de rango uno de la Gram (O(p²) por fila)
+                en lugar de reconstruir la matriz de diseño completa. La
+                caché se valida con el sha256 completo de las columnas del
+                prefijo (cualquier corrección de una jornada antigua fuerza
+                la reconstrucción); el hash del prefijo se extiende con las
+                filas nuevas → los datos se recorren una sola vez.
+Salida:         data/processed/modelo_coeficientes.json (DSS + scoring por lote)
+Ejecución:      python src/modelo_prescriptivo.py [--benchmark]
+================================================================================
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from main import RO_OPTIMO_MIN, RO_OPTIMO_MAX, RO_CRITICO, PROCESSED_PATH, BASE_DIR
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ESPECIFICACIÓN DEL MODELO
+# ─────────────────────────────────────────────────────────────────────────────
+FEATURES = [
+    'pedidos_fisicos', 'ratio_optimizacion', 'franja_pico', 'duracion_horas',
+    'zona_arbitraje_optima', 'alerta_critica'
+]
+OBJETIVO     = 'utilidad_neta'
+LAMBDA_RIDGE = 0.0        # 0 → OLS · >0 → ridge sobre features estandarizadas
+TAMANO_BLOQUE = 1_000_000  # Filas por bloque al acumular la Gram
+
+GRAM_PATH         = os.path.join(BASE_DIR, 'data', 'processed', 'modelo_gram.npz')
+COEFICIENTES_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'modelo_coeficientes.json')
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 1: MATRIZ DE DISEÑO Y GRAM
+# ─────────────────────────────────────────────────────────────────────────────
+
+def matriz_diseno(df: pd.DataFrame) -> np.ndarray:
+    """X = [1 | FEATURES] como float64 (n × 7)."""
+    X = np.empty((len(df), len(FEATURES) + 1))
+    X[:, 0] = 1.0
+    X[:, 1:] = df[FEATURES].to_numpy(dtype=float)
+    return X
+
+
+def _valores(df: pd.DataFrame) -> np.ndarray:
+    """Columnas del modelo como float64 C-contiguo · se hashea sin copiar (.data)."""
+    return np.ascontiguousarray(df[FEATURES + [OBJETIVO]].to_numpy(dtype=float))
+
+
+def acumular_gram(df: pd.DataFrame, tamano_bloque: int = TAMANO_BLOQUE) -> dict:
+    """
+    Estadísticos suficientes del modelo lineal: XᵀX, Xᵀy, yᵀy, n.
+    Se acumulan por bloques → memoria O(bloque · p) a cualquier N.
+    """
+    p = len(FEATURES) + 1
+    gram = {'xtx': np.zeros((p, p)), 'xty': np.zeros(p), 'yty': 0.0, 'n': 0}
+    for i in range(0, len(df), tamano_bloque):
+        bloque = df.iloc[i:i + tamano_bloque]
+        X = matriz_diseno(bloque)
+        y = bloque[OBJETIVO].to_numpy(dtype=float)
+        gram['xtx'] += X.T @ X
+        gram['xty'] += X.T @ y
+        gram['yty'] += float(y @ y)
+        gram['n']   += len(bloque)
+    return gram
+
+
+def actualizar_gram(gram: dict, filas_nuevas: pd.DataFrame) -> dict:
+    """
+    Recalibración N+1: suma x·xᵀ, x·y e y² de cada jornada nueva
+    (actualización de rango uno · no recorre las filas ya acumuladas).
+    """
+    X = matriz_diseno(filas_nuevas)
+    y = filas_nuevas[OBJETIVO].to_numpy(dtype=float)
+    for x_i, y_i in zip(X, y):
+        gram['xtx'] += np.outer(x_i, x_i)
+        gram['xty'] += x_i * y_i
+        gram['yty'] += y_i * y_i
+    gram['n'] += len(y)
+    return gram
+
+
+def gram_cacheada(df: pd.DataFrame, path: str = GRAM_PATH, reconstruir: bool = False) -> dict:
+    """
+    Retorna la Gram de `df` reutilizando la caché en disco.
+    Si el dataset es la caché + filas nuevas al final (protocolo N+1), solo
+    se aplican las actualizaciones de rango uno; si cualquier fila del
+    prefijo cambió (o reconstruir=True), se reconstruye desde cero.
+    """
+    valores = _valores(df)
+    gram, huella = None, None
+    if os.path.exists(path) and not reconstruir:
+        cache = np.load(path)
+        n_cache = int(cache['n'])
+        if n_cache <= len(df):
+            huella = hashlib.sha256(valores[:n_cache].data)
+            if huella.hexdigest() == str(cache['huella']):
+                gram = {'xtx': cache['xtx'], 'xty': cache['xty'],
+                        'yty': float(cache['yty']), 'n': n_cache}
+                if n_cache < len(df):
+                    gram = actualizar_gram(gram, df.iloc[n_cache:])
+                # sha256(prefijo ‖ nuevas) = hash de todo el dataset sin releer el prefijo
+                huella.update(valores[n_cache:].data)
+    if gram is None:
+        gram = acumular_gram(df)
+        huella = hashlib.sha256(valores.data)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez(path, xtx=gram['xtx'], xty=gram['xty'], yty=gram['yty'],
+             n=gram['n'], huella=huella.hexdigest())
+    return gram
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 2: ESTIMACIÓN
+# ─────────────────────────────────────────────────────────────────────────────
+
+def ajustar_modelo(gram: dict, lambda_ridge: float = LAMBDA_RIDGE) -> dict:
+    """
+    Resuelve las ecuaciones normales centradas:
+      (C + λ·diag(C))·β = c_xy ,  intercepto = ȳ − μᵀβ
+    con C = Gram centrada de las features. λ=0 → OLS exacto; λ>0 → ridge
+    equivalente a penalizar las features estandarizadas (intercepto libre).
+    Rango deficiente (p.ej. sin jornadas en alerta crítica) → solución de
+    norma mínima vía lstsq.
+    """
+    n, xtx, xty = gram['n'], gram['xtx'], gram['xty']
+    p = xtx.shape[0] - 1
+    if n <= p + 1:
+        raise ValueError(f"[MODELO ERROR] N={n} insuficiente para {p} features")
+
+    mu    = xtx[0, 1:] / n
+    y_bar = xty[0] / n
+    C     = xtx[1:, 1:] - n * np.outer(mu, mu)
+    c_xy  = xty[1:] - n * mu * y_bar
+    A     = C + lambda_ridge * np.diag(np.diag(C))
+    beta, *_ = np.linalg.lstsq(A, c_xy, rcond=None)
+    intercepto = y_bar - mu @ beta
+
+    coef = np.concatenate([[intercepto], beta])
+    sce  = gram['yty'] - 2 * coef @ xty + coef @ xtx @ coef   # Σ residuos²
+    sct  = gram['yty'] - n * y_bar ** 2
+    sce  = max(sce, 0.0)
+
+    return {
+        'features':       FEATURES,
+        'intercepto':     round(float(intercepto), 2),
+        'coeficientes':   {f: round(float(b), 2) for f, b in zip(FEATURES, beta)},
+        'lambda_ridge':   lambda_ridge,
+        'n':              int(n),
+        'r_squared':      round(float(1 - sce / sct), 4) if sct > 0 else float('nan'),
+        'sigma_residual': round(float(np.sqrt(sce / (n - p - 1))), 2),
+        'umbrales':       {'ro_optimo_min': RO_OPTIMO_MIN,
+                           'ro_optimo_max': RO_OPTIMO_MAX,
+                           'ro_critico':    RO_CRITICO},
+    }
+
+
+def exportar_coeficientes(modelo: dict, path: str = COEFICIENTES_PATH):
+    """Persiste el modelo como JSON legible por el DSS y el scoring por lote."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(modelo, f, indent=2, ensure_ascii=False)
+    print(f"  ✓ Coeficientes exportados: {path}")
+
+
+def cargar_coeficientes(path: str = COEFICIENTES_PATH) -> dict:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 3: SCORING (DSS Y LOTE)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def predecir_utilidad(modelo: dict, pedidos, ro, franja_pico, duracion_horas) -> np.ndarray:
+    """
+    Utilidad neta esperada para jornadas candidatas (escalares o arrays).
+    Las banderas de zona se derivan del RO con los umbrales del modelo.
+    """
+    u  = modelo['umbrales']
+    ro = np.asarray(ro, dtype=float)
+    valores = {
+        'pedidos_fisicos':       np.asarray(pedidos, dtype=float),
+        'ratio_optimizacion':    ro,
+        'franja_pico':           np.asarray(franja_pico, dtype=float),
+        'duracion_horas':        np.asarray(duracion_horas, dtype=float),
+        'zona_arbitraje_optima': ((ro >= u['ro_optimo_min']) & (ro <= u['ro_optimo_max'])).astype(float),
+        'alerta_critica':        (ro >= u['ro_critico']).astype(float),
+    }
+    pred = modelo['intercepto']
+    for f in modelo['features']:
+        pred = pred + modelo['coeficientes'][f] * valores[f]
+    return pred
+
+
+def puntuar_lote(df: pd.DataFrame, modelo: dict) -> pd.Series:
+    """Scoring por lote sobre un DataFrame procesado (columnas FEATURES)."""
+    coef = np.array([modelo['intercepto']] + [modelo['coeficientes'][f] for f in modelo['features']])
+    return pd.Series(matriz_diseno(df) @ coef, index=df.index, name='utilidad_esperada')
+
+
+def imprimir_modelo(modelo: dict):
+    sep = "=" * 70
+    print(f"\n{sep}")
+    print("MODELO PRESCRIPTIVO MULTIVARIADO v1.2")
+    print(sep)
+    print(f"  N:                    {modelo['n']} jornadas · λ ridge={modelo['lambda_ridge']}")
+    print(f"  Intercepto:           ${modelo['intercepto']:,} COP")
+    for f, b in modelo['coeficientes'].items():
+        print(f"  β {f:<24}${b:,} COP")
+    print(f"  R²:                   {modelo['r_squared']}")
+    print(f"  σ residual:           ${modelo['sigma_residual']:,} COP")
+    print(f"{sep}\n")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# BENCHMARK
+# ─────────────────────────────────────────────────────────────────────────────
+
+def benchmark(df: pd.DataFrame, n_filas: int = 2_000_000, n_nuevas: int = 1_000):
+    """Tiempo de ajuste completo a 10⁶+ filas vs recalibración N+1 incremental."""
+    rng = np.random.default_rng(42)
+    sintetico = df.iloc[rng.integers(0, len(df), n_filas)].reset_index(drop=True)
+    sintetico['utilidad_neta'] = sintetico['utilidad_neta'] + rng.normal(0, 10_000, n_filas)
+
+    t0 = time.perf_counter()
+    gram = acumular_gram(sintetico)
+    t_gram = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    ajustar_modelo(gram)
+    t_solve = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    actualizar_gram(gram, sintetico.iloc[:n_nuevas])
+    t_update = time.perf_counter() - t0
+
+    # Caché en disco: N filas cacheadas + n_nuevas al final (camino N+1 real)
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, 'gram.npz')
+        gram_cacheada(sintetico.iloc[:n_filas - n_nuevas], ruta)
+        t0 = time.perf_counter()
+        gram_cacheada(sintetico, ruta)
+        t_cache = time.perf_counter() - t0
+
+    print(f"  Benchmark N={n_filas:,} filas:")
+    print(f"    Gram (XᵀX) completa:        {t_gram:.3f}s  ({n_filas / t_gram:,.0f} filas/s)")
+    print(f"    Resolución ecuaciones:      {t_solve * 1e3:.3f}ms")
+    print(f"    {n_nuevas:,} actualizaciones N+1:   {t_update * 1e3:.1f}ms "
+          f"({t_update / n_nuevas * 1e6:.1f}µs/fila)")
+    print(f"    {f'gram_cacheada N+{n_nuevas:,}:':<28}{t_cache * 1e3:.1f}ms "
+          f"(validación + actualización + guardado)")
+
+
+if __name__ == '__main__':
+    df = pd.read_csv(PROCESSED_PATH)
+    if '--benchmark' in sys.argv:
+        benchmark(df)
+    else:
+        modelo = ajustar_modelo(gram_cacheada(df))
+        exportar_coeficientes(modelo)
+        imprimir_modelo(modelo)
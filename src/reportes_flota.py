@@ -0,0 +1,275 @@
+"""
+================================================================================
+REPORTES DE FLOTA v1.2 — GENERACIÓN NOCTURNA HEADLESS POR CONDUCTOR
+Sistema de Soporte a la Decisión · DiDi Food · San Cristóbal Sur, Bogotá D.C.
+================================================================================
+Objetivo:       Las gráficas Tufte del DSS (asimetría, HOPs, punto de quiebre
+                RO, raincloud ROI) para cada conductor sin abrir Streamlit.
+Entrada:        Dataset de flota con columna `conductor` (ingesta_async.py →
+                data/processed/didi_flota_v1.2.csv, por defecto si existe);
+                sin ella se trata como un único conductor.
+Figuras:        figuras.py (misma lógica que app_copiloto.py, sin st.*).
+Salida:         data/reportes/
+                  <conductor>-<hash8>/reporte.html  ← KPIs + 4 figuras (plotly.js CDN)
+                  <conductor>-<hash8>/<figura>.png  ← solo si kaleido está instalado
+                  manifiesto.json               ← huella de datos por conductor
+Incremental:    Se omiten los conductores cuya huella (version_dataset +
+                VERSION_REPORTE) coincide con el manifiesto y cuyo reporte
+                existe; --forzar regenera todos.
+Paralelismo:    Un reporte por tarea en ProcessPoolExecutor; un fallo aislado
+                se reporta sin detener el lote.
+Ejecución:      python src/reportes_flota.py [dataset.csv] [--forzar]
+                python src/reportes_flota.py --benchmark [n_conductores]
+================================================================================
+"""
+
+import hashlib
+import html
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from main import PROCESSED_PATH, FLOTA_PATH, BASE_DIR
+from figuras import (calcular_kpis, figura_asimetria, figura_hops_base,
+                     figura_quiebre_ro_base, figura_raincloud_roi, version_dataset)
+
+try:
+    import kaleido  # noqa: F401 — motor de plotly para exportar PNG
+    PNG_DISPONIBLE = True
+except ImportError:
+    PNG_DISPONIBLE = False
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PARÁMETROS
+# ─────────────────────────────────────────────────────────────────────────────
+REPORTES_DIR    = os.path.join(BASE_DIR, 'data', 'reportes')
+VERSION_REPORTE = 'v1.2-1'       # Cambiar invalida todos los reportes del manifiesto
+N_HOPS          = 50
+CONDUCTOR_UNICO = 'flota'
+
+FIGURAS = [
+    ('asimetria',  'Asimetría algorítmica',   figura_asimetria),
+    ('hops',       'HOPs · utilidad esperada', lambda df: figura_hops_base(df, N_HOPS)),
+    ('quiebre_ro', 'Punto de quiebre RO',     figura_quiebre_ro_base),
+    ('roi',        'Raincloud ROI',           figura_raincloud_roi),
+]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 1: PARTICIÓN Y MANIFIESTO
+# ─────────────────────────────────────────────────────────────────────────────
+
+def particionar(df: pd.DataFrame) -> dict:
+    """{conductor: jornadas} · sin columna `conductor` → un único grupo."""
+    if 'conductor' not in df.columns:
+        return {CONDUCTOR_UNICO: df.reset_index(drop=True)}
+    return {str(c): g.drop(columns='conductor').reset_index(drop=True)
+            for c, g in df.groupby('conductor', sort=True)}
+
+
+def huella(df: pd.DataFrame) -> str:
+    return f"{VERSION_REPORTE}:{version_dataset(df)}"
+
+
+def _ruta_manifiesto(salida: str) -> str:
+    return os.path.join(salida, 'manifiesto.json')
+
+
+def cargar_manifiesto(salida: str = REPORTES_DIR) -> dict:
+    ruta = _ruta_manifiesto(salida)
+    if not os.path.exists(ruta):
+        return {}
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def guardar_manifiesto(manifiesto: dict, salida: str = REPORTES_DIR):
+    """Escritura atómica (tmp + replace) → un corte a mitad no corrompe el manifiesto."""
+    ruta = _ruta_manifiesto(salida)
+    tmp = f"{ruta}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, indent=2, sort_keys=True, ensure_ascii=False)
+    os.replace(tmp, ruta)
+
+
+def _nombre_carpeta(conductor: str) -> str:
+    """Id saneado + sha256 del id original → ids distintos nunca comparten carpeta."""
+    limpio = "".join(c if c.isalnum() or c in '-_.' else '_' for c in conductor)
+    return f"{limpio}-{hashlib.sha256(conductor.encode('utf-8')).hexdigest()[:8]}"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 2: RENDER DE UN REPORTE (WORKER)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _tabla_kpis(kpis: dict) -> str:
+    filas = [
+        ('Jornadas (N válido)',  f"{kpis['n_total']} ({kpis['n_valido']})"),
+        ('ROI del periodo',      f"{kpis['roi_periodo']:.2f}%"),
+        ('RO media / mediana',   f"{kpis['ro_media']:.3f} / {kpis['ro_mediana']:.3f}"),
+        ('km fantasma',          f"{kpis['km_fantasma']:,} km ({kpis['pct_fantasma']}%)"),
+        ('Proporción bono',      f"{kpis['prop_bono']}%"),
+    ]
+    return "<table>" + "".join(f"<tr><th>{k}</th><td>{v}</td></tr>" for k, v in filas) + "</table>"
+
+
+def renderizar_reporte(conductor: str, df: pd.DataFrame, carpeta: str, png: bool = False) -> dict:
+    """Escribe reporte.html (y PNG opcionales) de un conductor · retorna métricas."""
+    t0 = time.perf_counter()
+    os.makedirs(carpeta, exist_ok=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        kpis = calcular_kpis(df)
+
+    secciones = []
+    for i, (clave, titulo, construir) in enumerate(FIGURAS):
+        fig = construir(df)
+        div = pio.to_html(fig, full_html=False, include_plotlyjs='cdn' if i == 0 else False,
+                          default_width='100%', default_height='480px')
+        secciones.append(f"<h2>{titulo}</h2>\n{div}")
+        if png:
+            fig.write_image(os.path.join(carpeta, f"{clave}.png"), width=1200, height=600)
+
+    nombre = html.escape(conductor)
+    documento = (
+        "<!DOCTYPE html>\n<html lang='es'><head><meta charset='utf-8'>"
+        f"<title>Reporte DSS · {nombre}</title>"
+        "<style>body{font-family:sans-serif;color:#2C3E50;max-width:1100px;margin:auto}"
+        "th{text-align:left;padding-right:2em}</style></head><body>\n"
+        f"<h1>Reporte DSS v1.2 · {nombre}</h1>\n{_tabla_kpis(kpis)}\n"
+        + "\n".join(secciones) + "\n</body></html>\n"
+    )
+    with open(os.path.join(carpeta, 'reporte.html'), 'w', encoding='utf-8') as f:
+        f.write(documento)
+    return {'conductor': conductor, 'jornadas': len(df), 'segundos': time.perf_counter() - t0}
+
+
+def _tarea(args) -> dict:
+    conductor, df, carpeta, png = args
+    return renderizar_reporte(conductor, df, carpeta, png)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 3: LOTE NOCTURNO
+# ─────────────────────────────────────────────────────────────────────────────
+
+def generar_reportes(df: pd.DataFrame, salida: str = REPORTES_DIR, forzar: bool = False,
+                     png: bool = None, n_procesos: int = None) -> dict:
+    """
+    Genera los reportes pendientes de toda la flota.
+    png=None → PNG solo si kaleido está instalado.
+    Retorna conteos (generados, omitidos, fallidos), segundos y reportes/minuto.
+    """
+    if png is None:
+        png = PNG_DISPONIBLE
+    elif png and not PNG_DISPONIBLE:
+        print("  ⚠  kaleido no instalado: se omiten los PNG (pip install kaleido)")
+        png = False
+
+    os.makedirs(salida, exist_ok=True)
+    manifiesto = cargar_manifiesto(salida)
+    t0 = time.perf_counter()
+
+    pendientes, huellas, omitidos = [], {}, 0
+    for conductor, grupo in particionar(df).items():
+        carpeta = os.path.join(salida, _nombre_carpeta(conductor))
+        h = huella(grupo)
+        if (not forzar and manifiesto.get(conductor) == h
+                and os.path.exists(os.path.join(carpeta, 'reporte.html'))):
+            omitidos += 1
+            continue
+        huellas[conductor] = h
+        pendientes.append((conductor, grupo, carpeta, png))
+
+    generados, fallidos = [], []
+    if pendientes:
+        n_procesos = min(n_procesos or os.cpu_count() or 1, len(pendientes))
+        with ProcessPoolExecutor(max_workers=n_procesos) as pool:
+            futuros = {pool.submit(_tarea, args): args[0] for args in pendientes}
+            for futuro in as_completed(futuros):
+                conductor = futuros[futuro]
+                try:
+                    generados.append(futuro.result())
+                    manifiesto[conductor] = huellas[conductor]
+                except Exception as e:
+                    fallidos.append(conductor)
+                    print(f"  ⚠  {conductor}: {type(e).__name__}: {e}")
+        guardar_manifiesto(manifiesto, salida)
+
+    segundos = time.perf_counter() - t0
+    return {
+        'generados':         len(generados),
+        'omitidos':          omitidos,
+        'fallidos':          fallidos,
+        'png':               png,
+        'segundos':          round(segundos, 2),
+        'reportes_por_min':  round(len(generados) / segundos * 60, 1) if generados else 0.0,
+        'render_medio_s':    round(float(np.mean([g['segundos'] for g in generados])), 3)
+                             if generados else np.nan,
+    }
+
+
+def imprimir_resumen(res: dict, salida: str = REPORTES_DIR):
+    sep = "=" * 70
+    print(f"\n{sep}")
+    print("REPORTES DE FLOTA v1.2 — LOTE NOCTURNO")
+    print(sep)
+    print(f"  Generados:              {res['generados']}")
+    print(f"  Omitidos (sin cambio):  {res['omitidos']}")
+    print(f"  Fallidos:               {len(res['fallidos'])}")
+    print(f"  PNG:                    {'sí' if res['png'] else 'no (kaleido no instalado)'}")
+    print(f"  Tiempo total:           {res['segundos']:.2f} s · render medio {res['render_medio_s']} s")
+    print(f"  Throughput:             {res['reportes_por_min']:,} reportes/min")
+    print(f"  Salida:                 {salida}")
+    print(f"{sep}\n")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# BENCHMARK
+# ─────────────────────────────────────────────────────────────────────────────
+
+def flota_sintetica(df: pd.DataFrame, n_conductores: int, semilla: int = 42) -> pd.DataFrame:
+    """Replica el dataset en n conductores con remuestreo (historiales distintos)."""
+    rng = np.random.default_rng(semilla)
+    partes = []
+    for i in range(n_conductores):
+        parte = df.iloc[rng.integers(0, len(df), len(df))].reset_index(drop=True)
+        parte.insert(0, 'conductor', f"conductor_{i:04d}")
+        partes.append(parte)
+    return pd.concat(partes, ignore_index=True)
+
+
+def benchmark(df: pd.DataFrame, n_conductores: int = 200):
+    """Lote completo en frío y re-ejecución con un solo conductor modificado."""
+    flota = flota_sintetica(df, n_conductores)
+    salida = tempfile.mkdtemp(prefix='reportes_flota_')
+    try:
+        frio = generar_reportes(flota, salida, png=False)
+        print(f"  Frío:        {frio['generados']} reportes en {frio['segundos']:.2f} s "
+              f"→ {frio['reportes_por_min']:,} reportes/min")
+        cambio = flota['conductor'] == 'conductor_0000'
+        flota.loc[cambio, 'pedidos_fisicos'] += 1
+        inc = generar_reportes(flota, salida, png=False)
+        print(f"  Incremental: {inc['generados']} generado · {inc['omitidos']} omitidos "
+              f"en {inc['segundos']:.2f} s")
+    finally:
+        shutil.rmtree(salida, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if '--benchmark' in sys.argv:
+        benchmark(pd.read_csv(PROCESSED_PATH), int(args[0]) if args else 200)
+    else:
+        entrada = args[0] if args else (FLOTA_PATH if os.path.exists(FLOTA_PATH) else PROCESSED_PATH)
+        df = pd.read_csv(entrada, dtype={'conductor': str})
+        res = generar_reportes(df, forzar='--forzar' in sys.argv)
+        imprimir_resumen(res)
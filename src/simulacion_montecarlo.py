@@ -0,0 +1,236 @@
+"""
+================================================================================
+SIMULADOR MONTE CARLO v1.2 — DECISIÓN PROBABILÍSTICA SÍ/NO OPERAR
+Sistema de Soporte a la Decisión · DiDi Food · San Cristóbal Sur, Bogotá D.C.
+================================================================================
+Objetivo:       Complementar la regla determinista por umbrales de RO con la
+                distribución completa de utilidad_neta y utilidad_por_hora
+                de una jornada candidata → P(utilidad > umbral).
+Muestreo:       Bootstrap de jornadas históricas completas (ingreso por
+                pedido, horas por pedido y gastos de la misma jornada):
+                  · uniforme dentro de la misma franja (PICO/VALLE) si hay
+                    soporte · el RO no elige jornadas (evita arrastrar el
+                    ingreso por pedido de los días de RO alto)
+                  · pedidos ~ Poisson(pedidos proyectados)
+                  · RO simulado = RO candidato + ruido N(0, ancho Silverman)
+Efecto RO:      Cada jornada muestreada se lleva al RO simulado, sea cual sea
+                su RO histórico:
+                  · ingreso/pedido × ef(RO sim) / ef(RO hist), con
+                    ef = FACTOR_CRITICO si RO ≥ RO_CRITICO, si no 1 ·
+                    FACTOR_CRITICO = mediana ingreso/pedido crítico / no
+                    crítico (nunca más suave que FACTOR_EFIC_CRITICA)
+                  · gastos × RO sim / RO hist (km recorridos ∝ RO)
+                utilidad = pedidos × ingreso_por_pedido − gastos_operativos
+                utilidad/h = utilidad / (pedidos × horas_por_pedido)
+Rendimiento:    Lotes NumPy vectorizados (10⁶ trayectorias/lote) · shards
+                opcionales en ProcessPoolExecutor con semillas independientes.
+Decisión:       P(utilidad/h > UMBRAL_UTILIDAD_HORA) — costo de oportunidad
+                de la hora; por defecto la mediana histórica de
+                utilidad_por_hora — P ≥ PROB_SI → SÍ OPERAR ·
+                P < PROB_NO → NO OPERAR · resto MONITOREAR.
+                P(pérdida) y P(superar la mediana de utilidad_neta) se
+                reportan aparte.
+Ejecución:      python src/simulacion_montecarlo.py <pedidos> <ro> <HH:MM>
+                python src/simulacion_montecarlo.py --lote candidatos.csv
+================================================================================
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from main import calcular_franja_pico, RO_CRITICO, FACTOR_EFIC_CRITICA, PROCESSED_PATH
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PARÁMETROS DE SIMULACIÓN
+# ─────────────────────────────────────────────────────────────────────────────
+N_TRAYECTORIAS   = 1_000_000
+N_TRAYECTORIAS_DSS = 20_000   # Dashboard · error estándar de P ≤ 0.35 pp, ~5 ms por rerun
+TAMANO_LOTE      = 1_000_000
+MIN_SOPORTE_FRANJA = 5        # Jornadas mínimas en la franja para condicionar
+PROB_SI          = 0.60
+PROB_NO          = 0.40
+UMBRAL_UTILIDAD_HORA = None   # COP/h · None → mediana histórica de utilidad_por_hora
+MIN_SOPORTE_CRITICO  = 2      # Jornadas críticas mínimas para estimar FACTOR_CRITICO
+SEMILLA          = 42
+CUANTILES        = (0.05, 0.50, 0.95)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 1: BASE EMPÍRICA
+# ─────────────────────────────────────────────────────────────────────────────
+
+def preparar_base(df: pd.DataFrame) -> dict:
+    """
+    Arrays de las jornadas históricas usadas en el bootstrap.
+    Excluye jornadas sin pedidos o sin duración (ingreso por pedido indefinido).
+    El ingreso por pedido se guarda neutralizado (como si la jornada no
+    estuviera en zona crítica) para re-aplicar la eficiencia del RO simulado.
+    """
+    df = df.loc[(df['pedidos_fisicos'] > 0) & (df['duracion_horas'] > 0)]
+    if len(df) < 2:
+        raise ValueError("[SIMULACIÓN ERROR] Se requieren ≥2 jornadas válidas")
+    ro         = df['ratio_optimizacion'].to_numpy(dtype=float)
+    ingreso_pp = (df['garantizado_meta'] / df['pedidos_fisicos']).to_numpy(dtype=float)
+    critica    = ro >= RO_CRITICO
+
+    factor = FACTOR_EFIC_CRITICA
+    if MIN_SOPORTE_CRITICO <= critica.sum() < len(ro):
+        factor = min(np.median(ingreso_pp[critica]) / np.median(ingreso_pp[~critica]),
+                     FACTOR_EFIC_CRITICA)
+    return {
+        'ro':          ro,
+        'pico':        df['franja_pico'].to_numpy(dtype=int),
+        'pedidos':     df['pedidos_fisicos'].to_numpy(dtype=float),
+        'ingreso_pp':  np.where(critica, ingreso_pp / factor, ingreso_pp),
+        'horas_pp':    (df['duracion_horas'] / df['pedidos_fisicos']).to_numpy(dtype=float),
+        'gastos':      df['gastos_operativos'].to_numpy(dtype=float),
+        'factor_critico': float(factor),
+        # Ancho de banda de Silverman para el ruido sobre RO
+        'ancho_ro':    1.06 * ro.std(ddof=1) * len(ro) ** (-1 / 5),
+        'utilidad_mediana':      float(df['utilidad_neta'].median()),
+        'utilidad_hora_mediana': float((df['utilidad_neta'] / df['duracion_horas']).median()),
+    }
+
+
+def _probabilidades(base: dict, es_pico: bool) -> np.ndarray:
+    """Pesos de muestreo de cada jornada histórica · uniforme en la franja del candidato."""
+    w = np.ones_like(base['ro'])
+    if es_pico is not None:
+        misma_franja = base['pico'] == int(es_pico)
+        if misma_franja.sum() >= MIN_SOPORTE_FRANJA:
+            w = w * misma_franja
+    return w / w.sum()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 2: TRAYECTORIAS VECTORIZADAS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _simular_shard(args) -> tuple:
+    """Simula n trayectorias en lotes · retorna (utilidad, utilidad_hora, ro) float32."""
+    base, probs, pedidos, ro, n, semilla = args
+    rng = np.random.default_rng(semilla)
+    util = np.empty(n, dtype=np.float32)
+    uph  = np.empty(n, dtype=np.float32)
+    ro_out = np.empty(n, dtype=np.float32)
+    for i in range(0, n, TAMANO_LOTE):
+        k = min(TAMANO_LOTE, n - i)
+        j = rng.choice(len(probs), size=k, p=probs)
+        # Sin proyección de pedidos → se usan los pedidos de la jornada muestreada
+        ped = rng.poisson(pedidos, size=k) if pedidos is not None else base['pedidos'][j]
+        # Sin RO candidato → RO de la jornada muestreada (con ruido)
+        ro_hist = base['ro'][j]
+        ro_sim  = (ro_hist if ro is None else ro) + base['ancho_ro'] * rng.standard_normal(k)
+        ro_sim  = np.maximum(ro_sim, 1.0)        # km_didi ≥ km_google
+        ef   = np.where(ro_sim >= RO_CRITICO, base['factor_critico'], 1.0)
+        u    = ped * ef * base['ingreso_pp'][j] - base['gastos'][j] * ro_sim / ro_hist
+        horas = np.maximum(ped, 1) * base['horas_pp'][j]
+        util[i:i + k] = u
+        uph[i:i + k]  = u / horas
+        ro_out[i:i + k] = ro_sim
+    return util, uph, ro_out
+
+
+def simular_turno(base: dict, pedidos: float = None, ro: float = None,
+                  hora_inicio: str = None, umbral: float = None,
+                  n_trayectorias: int = N_TRAYECTORIAS, n_procesos: int = 1,
+                  semilla: int = SEMILLA) -> dict:
+    """
+    Distribución de resultados de una jornada candidata.
+    `umbral` es utilidad por hora (COP/h): por defecto UMBRAL_UTILIDAD_HORA o,
+    si es None, la mediana histórica · la jornada debe pagar la hora mejor que
+    un día típico, no solo cubrir gastos. Retorna probabilidades, cuantiles y decisión.
+    """
+    es_pico = bool(calcular_franja_pico(hora_inicio)) if hora_inicio is not None else None
+    if umbral is None:
+        umbral = UMBRAL_UTILIDAD_HORA
+    if umbral is None:
+        umbral = base['utilidad_hora_mediana']
+    probs   = _probabilidades(base, es_pico)
+
+    t0 = time.perf_counter()
+    semillas = np.random.SeedSequence(semilla).spawn(max(n_procesos, 1))
+    m        = len(semillas)
+    tamanos  = [n_trayectorias // m + (i < n_trayectorias % m) for i in range(m)]
+    shards   = [(base, probs, pedidos, ro, n, s) for n, s in zip(tamanos, semillas) if n]
+    if n_procesos > 1:
+        with ProcessPoolExecutor(max_workers=n_procesos) as pool:
+            partes = list(pool.map(_simular_shard, shards))
+    else:
+        partes = [_simular_shard(a) for a in shards]
+    util = np.concatenate([p[0] for p in partes])
+    uph  = np.concatenate([p[1] for p in partes])
+    ro_s = np.concatenate([p[2] for p in partes])
+    segundos = time.perf_counter() - t0
+
+    prob = float((uph > umbral).mean())
+    if prob >= PROB_SI:
+        decision = "SÍ OPERAR"
+    elif prob < PROB_NO:
+        decision = "NO OPERAR"
+    else:
+        decision = "MONITOREAR"
+
+    q_util = np.quantile(util, CUANTILES)
+    q_uph  = np.quantile(uph, CUANTILES)
+    return {
+        'pedidos': pedidos, 'ro': ro, 'hora_inicio': hora_inicio, 'es_pico': es_pico,
+        'umbral':              round(float(umbral), 2),
+        'prob_supera_umbral':  round(prob, 4),
+        'prob_perdida':        round(float((util <= 0).mean()), 4),
+        'mediana_historica':   round(base['utilidad_mediana'], 2),
+        'prob_supera_mediana': round(float((util > base['utilidad_mediana']).mean()), 4),
+        'prob_ro_critico':     round(float((ro_s >= RO_CRITICO).mean()), 4),
+        'utilidad_media':      round(float(util.mean()), 2),
+        'utilidad_p5':         round(float(q_util[0]), 2),
+        'utilidad_p50':        round(float(q_util[1]), 2),
+        'utilidad_p95':        round(float(q_util[2]), 2),
+        'utilidad_hora_p5':    round(float(q_uph[0]), 2),
+        'utilidad_hora_p50':   round(float(q_uph[1]), 2),
+        'utilidad_hora_p95':   round(float(q_uph[2]), 2),
+        'decision':            decision,
+        'n_trayectorias':      len(util),
+        'segundos':            round(segundos, 3),
+    }
+
+
+def simular_lote(base: dict, candidatos: pd.DataFrame, **kwargs) -> pd.DataFrame:
+    """
+    Modo batch: una simulación por fila de `candidatos`
+    (columnas opcionales: pedidos, ro, h_inicio, umbral en COP/h).
+    """
+    filas = []
+    for c in candidatos.to_dict('records'):
+        filas.append(simular_turno(
+            base,
+            pedidos=c.get('pedidos'),
+            ro=c.get('ro'),
+            hora_inicio=c.get('h_inicio'),
+            umbral=c.get('umbral'),
+            **kwargs
+        ))
+    return pd.DataFrame(filas)
+
+
+if __name__ == '__main__':
+    base = preparar_base(pd.read_csv(PROCESSED_PATH))
+    if len(sys.argv) == 3 and sys.argv[1] == '--lote':
+        candidatos = pd.read_csv(sys.argv[2], dtype={'h_inicio': str})
+        candidatos = candidatos.astype(object).where(candidatos.notna(), None)
+        print(simular_lote(base, candidatos, n_procesos=os.cpu_count() or 1).to_string(index=False))
+    elif len(sys.argv) == 4:
+        res = simular_turno(base, pedidos=float(sys.argv[1]), ro=float(sys.argv[2]),
+                            hora_inicio=sys.argv[3], n_procesos=os.cpu_count() or 1)
+        for k, v in res.items():
+            print(f"  {k:<22}{v}")
+        print(f"  {res['n_trayectorias'] / res['segundos']:,.0f} trayectorias/s")
+    else:
+        print("Uso: python src/simulacion_montecarlo.py <pedidos> <ro> <HH:MM> "
+              "| --lote candidatos.csv")
+        sys.exit(1)
@@ -0,0 +1,268 @@
+"""
+================================================================================
+SNAPSHOTS VERSIONADOS v1.2 — INVARIANTES + DATASET PROCESADO
+Sistema de Soporte a la Decisión · DiDi Food · San Cristóbal Sur, Bogotá D.C.
+================================================================================
+Objetivo:       Cada ejecución del pipeline deja un snapshot inmutable
+                (invariantes + dataset procesado) comparable con cualquier
+                ejecución anterior sin re-ejecutar código viejo.
+Almacén:        data/snapshots/
+                  bloques/<sha256>.csv.gz   ← bloques de filas direccionados por
+                                              contenido (deduplicados entre runs)
+                  manifiestos/<id>.json     ← invariantes + lista de bloques
+Bloques:        Cortes definidos por contenido: una fila cierra bloque si el
+                hash de su clave (fecha, h_inicio) ≡ 0 mod BLOQUE_MEDIO → una
+                jornada N+1 o una corrección solo reescribe su propio bloque.
+Diff:           Compara invariantes desde los manifiestos y carga únicamente
+                los bloques cuyo hash difiere entre ambos snapshots.
+Ejecución:      python src/snapshots.py listar
+                python src/snapshots.py diff <id_a> <id_b>
+================================================================================
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from main import BASE_DIR
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PARÁMETROS DEL ALMACÉN
+# ─────────────────────────────────────────────────────────────────────────────
+SNAPSHOTS_DIR = os.path.join(BASE_DIR, 'data', 'snapshots')
+CLAVE_JORNADA = ['fecha', 'h_inicio']
+BLOQUE_MEDIO  = 256       # Tamaño esperado de bloque (filas)
+BLOQUE_MAX    = 4 * BLOQUE_MEDIO
+FORMATO_FLOAT = '%.4f'    # Igual que exportar_procesado → bytes estables
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 1: BLOQUES DIRECCIONADOS POR CONTENIDO
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _cortes(df: pd.DataFrame) -> list:
+    """Índices [inicio, fin) de cada bloque según el hash de la clave de jornada."""
+    h = pd.util.hash_pandas_object(df[CLAVE_JORNADA].astype(str), index=False).to_numpy()
+    fines = np.flatnonzero(h % BLOQUE_MEDIO == 0) + 1
+    cortes, inicio = [], 0
+    for fin in list(fines) + [len(df)]:
+        while fin - inicio > BLOQUE_MAX:
+            cortes.append((inicio, inicio + BLOQUE_MAX))
+            inicio += BLOQUE_MAX
+        if fin > inicio:
+            cortes.append((inicio, fin))
+            inicio = fin
+    return cortes
+
+
+def _ruta_bloque(raiz: str, digest: str) -> str:
+    return os.path.join(raiz, 'bloques', f"{digest}.csv.gz")
+
+
+def _escribir_bloque(raiz: str, bloque: pd.DataFrame) -> tuple:
+    """Escribe el bloque si su contenido no existe aún · retorna (sha256, es_nuevo)."""
+    datos  = bloque.to_csv(index=False, float_format=FORMATO_FLOAT).encode('utf-8')
+    digest = hashlib.sha256(datos).hexdigest()
+    ruta   = _ruta_bloque(raiz, digest)
+    if os.path.exists(ruta):
+        return digest, False
+    tmp = ruta + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(gzip.compress(datos, mtime=0))
+    os.replace(tmp, ruta)
+    return digest, True
+
+
+def _leer_bloque(raiz: str, digest: str) -> pd.DataFrame:
+    with open(_ruta_bloque(raiz, digest), 'rb') as f:
+        return pd.read_csv(io.BytesIO(gzip.decompress(f.read())), dtype=str)
+
+
+def _a_json(valor):
+    """
+    Convierte escalares NumPy a tipos nativos para el manifiesto.
+    NaN/±inf → None (null en JSON estándar, no el literal NaN).
+    """
+    if isinstance(valor, np.generic):
+        valor = valor.item()
+    if isinstance(valor, float) and not np.isfinite(valor):
+        return None
+    return valor
+
+
+def _mismo_valor(a, b) -> bool:
+    """Igualdad de invariantes tolerante a NaN/None (manifiestos antiguos con NaN)."""
+    def _vacio(v):
+        return v is None or (isinstance(v, float) and np.isnan(v))
+    if _vacio(a) or _vacio(b):
+        return _vacio(a) and _vacio(b)
+    return a == b
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 2: GUARDAR / CARGAR SNAPSHOTS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def guardar_snapshot(df: pd.DataFrame, inv: dict, raiz: str = SNAPSHOTS_DIR) -> str:
+    """
+    Persiste el dataset procesado por bloques y un manifiesto con los
+    invariantes. Retorna el id del snapshot (AAAAMMDDTHHMMSS_<hash12>).
+    """
+    os.makedirs(os.path.join(raiz, 'bloques'), exist_ok=True)
+    os.makedirs(os.path.join(raiz, 'manifiestos'), exist_ok=True)
+
+    bloques = []
+    nuevos = 0
+    for inicio, fin in _cortes(df):
+        digest, es_nuevo = _escribir_bloque(raiz, df.iloc[inicio:fin])
+        nuevos += es_nuevo
+        bloques.append({'hash': digest, 'filas': int(fin - inicio)})
+
+    invariantes = {k: _a_json(v) for k, v in inv.items()}
+    contenido = json.dumps({'invariantes': invariantes, 'bloques': bloques}, sort_keys=True)
+    snap_id = (f"{datetime.now().strftime('%Y%m%dT%H%M%S')}_"
+               f"{hashlib.sha256(contenido.encode()).hexdigest()[:12]}")
+    manifiesto = {
+        'id':          snap_id,
+        'creado':      datetime.now().isoformat(timespec='seconds'),
+        'n_filas':     len(df),
+        'columnas':    list(df.columns),
+        'invariantes': invariantes,
+        'bloques':     bloques,
+    }
+    with open(os.path.join(raiz, 'manifiestos', f"{snap_id}.json"), 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, indent=2, ensure_ascii=False, allow_nan=False)
+    print(f"  ✓ Snapshot guardado: {snap_id} ({len(bloques)} bloques · {nuevos} nuevos)")
+    return snap_id
+
+
+def listar_snapshots(raiz: str = SNAPSHOTS_DIR) -> list:
+    """Ids de snapshots en orden cronológico."""
+    carpeta = os.path.join(raiz, 'manifiestos')
+    if not os.path.isdir(carpeta):
+        return []
+    return sorted(f[:-5] for f in os.listdir(carpeta) if f.endswith('.json'))
+
+
+def _resolver_id(snap_id: str, raiz: str) -> str:
+    """Acepta el id completo, un prefijo único o el sufijo hash."""
+    candidatos = [s for s in listar_snapshots(raiz)
+                  if s.startswith(snap_id) or s.split('_', 1)[-1].startswith(snap_id)]
+    if len(candidatos) != 1:
+        raise ValueError(f"[SNAPSHOT ERROR] Id ambiguo o inexistente: {snap_id} "
+                         f"({len(candidatos)} coincidencias)")
+    return candidatos[0]
+
+
+def cargar_manifiesto(snap_id: str, raiz: str = SNAPSHOTS_DIR) -> dict:
+    snap_id = _resolver_id(snap_id, raiz)
+    with open(os.path.join(raiz, 'manifiestos', f"{snap_id}.json"), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def cargar_snapshot(snap_id: str, raiz: str = SNAPSHOTS_DIR) -> pd.DataFrame:
+    """Reconstruye el dataset procesado completo de un snapshot."""
+    manifiesto = cargar_manifiesto(snap_id, raiz)
+    df = pd.concat([_leer_bloque(raiz, b['hash']) for b in manifiesto['bloques']],
+                   ignore_index=True)
+    return _tipar(df)
+
+
+def _tipar(df: pd.DataFrame) -> pd.DataFrame:
+    """Restaura columnas numéricas; fecha y horas se conservan como string."""
+    for col in df.columns:
+        if col not in ('fecha', 'h_inicio', 'h_fin'):
+            df[col] = pd.to_numeric(df[col])
+    return df
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 3: DIFF ENTRE SNAPSHOTS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def diferenciar(id_a: str, id_b: str, raiz: str = SNAPSHOTS_DIR) -> dict:
+    """
+    Diferencias A → B:
+      invariantes:  {nombre: (valor_a, valor_b)} de los invariantes que cambiaron
+      altas/bajas:  claves (fecha, h_inicio) presentes solo en B / solo en A
+      modificadas:  {clave: [columnas que cambiaron]}
+    Solo se leen los bloques cuyo hash no es común a ambos snapshots.
+    """
+    man_a, man_b = cargar_manifiesto(id_a, raiz), cargar_manifiesto(id_b, raiz)
+    inv_a, inv_b = man_a['invariantes'], man_b['invariantes']
+    invariantes = {k: (inv_a.get(k), inv_b.get(k))
+                   for k in sorted(set(inv_a) | set(inv_b))
+                   if not _mismo_valor(inv_a.get(k), inv_b.get(k))}
+
+    hashes_a = {b['hash'] for b in man_a['bloques']}
+    hashes_b = {b['hash'] for b in man_b['bloques']}
+    solo_a, solo_b = hashes_a - hashes_b, hashes_b - hashes_a
+
+    def _filas(hashes, columnas):
+        if not hashes:
+            return pd.DataFrame(columns=columnas, dtype=str)
+        return pd.concat([_leer_bloque(raiz, h) for h in sorted(hashes)], ignore_index=True)
+
+    filas_a = _filas(solo_a, man_a['columnas']).set_index(CLAVE_JORNADA)
+    filas_b = _filas(solo_b, man_b['columnas']).set_index(CLAVE_JORNADA)
+
+    altas = sorted(set(filas_b.index) - set(filas_a.index))
+    bajas = sorted(set(filas_a.index) - set(filas_b.index))
+    comunes = filas_a.index.intersection(filas_b.index)
+    columnas = [c for c in filas_a.columns if c in filas_b.columns]
+    a = filas_a.loc[comunes, columnas].fillna('')
+    b = filas_b.loc[comunes, columnas].fillna('')
+    distintas = a.ne(b)
+    modificadas = {clave: list(distintas.columns[fila])
+                   for clave, fila in zip(distintas.index, distintas.to_numpy()) if fila.any()}
+
+    return {
+        'id_a': man_a['id'], 'id_b': man_b['id'],
+        'invariantes': invariantes,
+        'altas': altas, 'bajas': bajas, 'modificadas': modificadas,
+        'bloques_leidos': len(solo_a) + len(solo_b),
+        'bloques_totales': len(man_a['bloques']) + len(man_b['bloques']),
+    }
+
+
+def imprimir_diff(diff: dict):
+    sep = "=" * 70
+    print(f"\n{sep}")
+    print(f"DIFF DE SNAPSHOTS — {diff['id_a']} → {diff['id_b']}")
+    print(sep)
+    print(f"  Bloques leídos:       {diff['bloques_leidos']}/{diff['bloques_totales']}")
+    print()
+    print(f"  ── INVARIANTES ({len(diff['invariantes'])} cambios) ─────────────────────────")
+    for k, (va, vb) in diff['invariantes'].items():
+        print(f"  {k:<22}{va} → {vb}")
+    print()
+    print(f"  ── JORNADAS ─────────────────────────────────────────")
+    print(f"  Altas:                {len(diff['altas'])}")
+    for fecha, hora in diff['altas']:
+        print(f"    + {fecha} {hora}")
+    print(f"  Bajas:                {len(diff['bajas'])}")
+    for fecha, hora in diff['bajas']:
+        print(f"    - {fecha} {hora}")
+    print(f"  Modificadas:          {len(diff['modificadas'])}")
+    for (fecha, hora), cols in diff['modificadas'].items():
+        print(f"    ~ {fecha} {hora}: {', '.join(cols)}")
+    print(f"{sep}\n")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) >= 2 and sys.argv[1] == 'listar':
+        for s in listar_snapshots():
+            print(s)
+    elif len(sys.argv) == 4 and sys.argv[1] == 'diff':
+        imprimir_diff(diferenciar(sys.argv[2], sys.argv[3]))
+    else:
+        print("Uso: python src/snapshots.py listar | diff <id_a> <id_b>")
+        sys.exit(1)
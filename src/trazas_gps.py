@@ -0,0 +1,266 @@
+"""
+================================================================================
+TRAZAS GPS v1.2 — km POR JORNADA DESDE PUNTOS CRUDOS
+Sistema de Soporte a la Decisión · DiDi Food · San Cristóbal Sur, Bogotá D.C.
+================================================================================
+Objetivo:       Sustituir la digitación manual de km_google_maps (y km_didi_app
+                si hay traza de la app) por la longitud haversine de la traza.
+Entrada:        Un archivo por jornada en un directorio:
+                  <fecha>_<HHMM>[_<fuente>].{csv,gpx}
+                  p.ej. 2025-12-06_1334.gpx · 2025-12-06_1334_didi.csv
+                  fuente ∈ {google (defecto), didi} · CSV con columnas lat,lon
+Cómputo:        Haversine vectorizado (NumPy) por bloques · el último punto de
+                cada bloque se arrastra al siguiente → memoria acotada por
+                TAMANO_BLOQUE sin importar el tamaño del archivo.
+                En GPX cada <trkseg> se mide por separado (sin saltos entre
+                segmentos) y cada punto procesado se desprende del árbol.
+                Dos archivos de la misma jornada y fuente (p.ej. .csv y .gpx)
+                son un error, no se suman.
+Integración:    ejecutar_pipeline(trazas_dir=...) reemplaza los km del CSV
+                crudo en las jornadas con traza.
+Ejecución:      python src/trazas_gps.py <directorio> · --benchmark
+                python src/main.py --trazas <directorio>
+================================================================================
+"""
+
+import os
+import re
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pandas as pd
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PARÁMETROS
+# ─────────────────────────────────────────────────────────────────────────────
+RADIO_TIERRA_KM = 6371.0088      # Radio medio (IUGG)
+TAMANO_BLOQUE   = 500_000        # Puntos por bloque en streaming
+COLUMNA_KM      = {'google': 'km_google_maps', 'didi': 'km_didi_app'}
+
+_PATRON_ARCHIVO = re.compile(
+    r'^(?P<fecha>\d{4}-\d{2}-\d{2})_(?P<hh>\d{2})(?P<mm>\d{2})'
+    r'(?:_(?P<fuente>google|didi))?\.(?P<ext>csv|gpx)$', re.IGNORECASE
+)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 1: DISTANCIA HAVERSINE
+# ─────────────────────────────────────────────────────────────────────────────
+
+def longitud_haversine(lat: np.ndarray, lon: np.ndarray) -> float:
+    """Longitud (km) de la polilínea lat/lon en grados · vectorizada."""
+    if len(lat) < 2:
+        return 0.0
+    phi = np.radians(lat)
+    lam = np.radians(lon)
+    dphi = np.diff(phi)
+    dlam = np.diff(lam)
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi[:-1]) * np.cos(phi[1:]) * np.sin(dlam / 2) ** 2
+    return float(2 * RADIO_TIERRA_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0))).sum())
+
+
+class _Acumulador:
+    """Suma longitudes bloque a bloque arrastrando el último punto."""
+
+    def __init__(self):
+        self.km = 0.0
+        self.puntos = 0
+        self._ultimo = None
+
+    def agregar(self, lat: np.ndarray, lon: np.ndarray):
+        if len(lat) == 0:
+            return
+        self.puntos += len(lat)
+        if self._ultimo is not None:
+            lat = np.concatenate([[self._ultimo[0]], lat])
+            lon = np.concatenate([[self._ultimo[1]], lon])
+        self.km += longitud_haversine(lat, lon)
+        self._ultimo = (lat[-1], lon[-1])
+
+    def cortar(self):
+        """Fin de segmento: el siguiente punto no se une al anterior."""
+        self._ultimo = None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 2: LECTURA EN STREAMING (CSV / GPX)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _km_csv(path: str, tamano_bloque: int) -> _Acumulador:
+    acc = _Acumulador()
+    for bloque in pd.read_csv(path, usecols=['lat', 'lon'], dtype=float,
+                              chunksize=tamano_bloque):
+        bloque = bloque.dropna()
+        acc.agregar(bloque['lat'].to_numpy(), bloque['lon'].to_numpy())
+    return acc
+
+
+def _km_gpx(path: str, tamano_bloque: int) -> _Acumulador:
+    acc = _Acumulador()
+    buf_lat, buf_lon = [], []
+
+    def vaciar():
+        acc.agregar(np.array(buf_lat, dtype=float), np.array(buf_lon, dtype=float))
+        buf_lat.clear()
+        buf_lon.clear()
+
+    # elem.clear() solo vacía el nodo: además se desprende del padre (pila de
+    # ancestros) para que <trkseg> no acumule un hijo vacío por punto
+    ancestros = []
+    for evento, elem in ET.iterparse(path, events=('start', 'end')):
+        if evento == 'start':
+            ancestros.append(elem)
+            continue
+        ancestros.pop()
+        etiqueta = elem.tag.rsplit('}', 1)[-1]   # Ignora el namespace GPX
+        if etiqueta == 'trkpt':
+            buf_lat.append(elem.get('lat'))
+            buf_lon.append(elem.get('lon'))
+            if len(buf_lat) >= tamano_bloque:
+                vaciar()
+        elif etiqueta == 'trkseg':
+            vaciar()
+            acc.cortar()
+        elif etiqueta not in ('wpt', 'rtept'):
+            continue
+        elem.clear()
+        if ancestros:
+            ancestros[-1].remove(elem)
+    vaciar()
+    return acc
+
+
+def km_traza(path: str, tamano_bloque: int = TAMANO_BLOQUE) -> tuple:
+    """Retorna (km, n_puntos) de un archivo de traza CSV o GPX."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        acc = _km_csv(path, tamano_bloque)
+    elif ext == '.gpx':
+        acc = _km_gpx(path, tamano_bloque)
+    else:
+        raise ValueError(f"[TRAZAS ERROR] Formato no soportado: {path}")
+    return acc.km, acc.puntos
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MÓDULO 3: km POR JORNADA E INTEGRACIÓN CON EL CSV CRUDO
+# ─────────────────────────────────────────────────────────────────────────────
+
+def km_por_jornada(directorio: str, tamano_bloque: int = TAMANO_BLOQUE) -> pd.DataFrame:
+    """
+    Mide todas las trazas del directorio.
+    Retorna una fila por jornada: fecha, h_inicio, km_google_maps, km_didi_app
+    (NaN si la fuente no tiene traza) y el total de puntos procesados.
+    """
+    filas = []
+    for nombre in sorted(os.listdir(directorio)):
+        m = _PATRON_ARCHIVO.match(nombre)
+        if not m:
+            continue
+        km, puntos = km_traza(os.path.join(directorio, nombre), tamano_bloque)
+        filas.append({
+            'fecha':    m['fecha'],
+            'h_inicio': f"{m['hh']}:{m['mm']}",
+            'columna':  COLUMNA_KM[(m['fuente'] or 'google').lower()],
+            'km':       round(km, 2),
+            'puntos':   puntos,
+            'archivo':  nombre,
+        })
+    if not filas:
+        raise ValueError(f"[TRAZAS ERROR] Sin trazas reconocidas en {directorio}")
+
+    largo = pd.DataFrame(filas)
+    duplicadas = largo.loc[largo.duplicated(['fecha', 'h_inicio', 'columna'], keep=False),
+                           'archivo']
+    if len(duplicadas):
+        raise ValueError(f"[TRAZAS ERROR] Más de una traza por jornada y fuente: "
+                         f"{sorted(duplicadas)}")
+    ancho = largo.pivot(index=['fecha', 'h_inicio'], columns='columna', values='km')
+    ancho['puntos'] = largo.groupby(['fecha', 'h_inicio'])['puntos'].sum()
+    ancho = ancho.reindex(columns=list(COLUMNA_KM.values()) + ['puntos'])
+    return ancho.reset_index().rename_axis(columns=None)
+
+
+def aplicar_km_trazas(df_crudo: pd.DataFrame, km: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sustituye km_google_maps / km_didi_app del CSV crudo por los km medidos
+    en las jornadas (fecha, h_inicio) que tienen traza. Jornadas sin traza
+    conservan el valor digitado. Las trazas sin jornada en el crudo se
+    listan como advertencia (no se aplican).
+    """
+    df = df_crudo.copy()
+    clave_crudo = df['fecha'].astype(str).str.strip() + ' ' + \
+        df['h_inicio'].astype(str).str.strip().str.zfill(5)
+    clave_traza = km['fecha'] + ' ' + km['h_inicio']
+    huerfanas = sorted(set(clave_traza) - set(clave_crudo))
+    if huerfanas:
+        print(f"  ⚠  Trazas GPS sin jornada en el CSV crudo (ignoradas): {huerfanas}")
+    reemplazos = 0
+    for col in COLUMNA_KM.values():
+        medidos = pd.Series(km[col].to_numpy(), index=clave_traza).dropna()
+        nuevos = clave_crudo.map(medidos)
+        df[col] = nuevos.fillna(df[col])
+        reemplazos += int(nuevos.notna().sum())
+    print(f"  ✓ Trazas GPS: {reemplazos} valores de km reemplazados "
+          f"({len(km) - len(huerfanas)} jornadas con traza · "
+          f"{int(km.loc[clave_traza.isin(clave_crudo), 'puntos'].sum()):,} puntos)")
+    return df
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# BENCHMARK
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _traza_sintetica(n: int, rng) -> tuple:
+    """Caminata aleatoria alrededor de San Cristóbal Sur (~4.57°N, 74.09°W)."""
+    lat = 4.57 + np.cumsum(rng.normal(0, 2e-5, n))
+    lon = -74.09 + np.cumsum(rng.normal(0, 2e-5, n))
+    return lat, lon
+
+
+def benchmark(n_puntos: int = 5_000_000):
+    """Throughput (puntos/s) del haversine en memoria y del streaming CSV/GPX."""
+    rng = np.random.default_rng(42)
+    lat, lon = _traza_sintetica(n_puntos, rng)
+
+    t0 = time.perf_counter()
+    km = longitud_haversine(lat, lon)
+    t = time.perf_counter() - t0
+    print(f"  Haversine en memoria:  {n_puntos:,} puntos · {km:,.1f} km · "
+          f"{n_puntos / t:,.0f} puntos/s")
+
+    n_gpx = n_puntos // 10
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta_csv = os.path.join(tmp, 'traza.csv')
+        pd.DataFrame({'lat': lat, 'lon': lon}).to_csv(ruta_csv, index=False)
+        t0 = time.perf_counter()
+        km_csv, puntos = km_traza(ruta_csv)
+        t = time.perf_counter() - t0
+        print(f"  Streaming CSV:         {puntos:,} puntos · {km_csv:,.1f} km · "
+              f"{puntos / t:,.0f} puntos/s")
+
+        ruta_gpx = os.path.join(tmp, 'traza.gpx')
+        with open(ruta_gpx, 'w') as f:
+            f.write('<?xml version="1.0"?><gpx xmlns="http://www.topografix.com/GPX/1/1">'
+                    '<trk><trkseg>\n')
+            f.writelines(f'<trkpt lat="{a:.7f}" lon="{o:.7f}"/>\n'
+                         for a, o in zip(lat[:n_gpx], lon[:n_gpx]))
+            f.write('</trkseg></trk></gpx>\n')
+        t0 = time.perf_counter()
+        km_gpx, puntos = km_traza(ruta_gpx)
+        t = time.perf_counter() - t0
+        print(f"  Streaming GPX:         {puntos:,} puntos · {km_gpx:,.1f} km · "
+              f"{puntos / t:,.0f} puntos/s")
+
+
+if __name__ == '__main__':
+    if '--benchmark' in sys.argv:
+        benchmark()
+    elif len(sys.argv) == 2:
+        print(km_por_jornada(sys.argv[1]).to_string(index=False))
+    else:
+        print("Uso: python src/trazas_gps.py <directorio> | --benchmark")
+        sys.exit(1)
@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from main import RAW_PATH
+from ingesta_async import COLUMNAS_GOOGLE, COLUMNAS_DIDI
+
+
+@pytest.fixture
+def exportar_flota():
+    """Fábrica: divide el crudo real en exportaciones <conductor>_{google|didi}.csv."""
+    def _exportar(directorio, n_conductores: int, filas: int = 5) -> pd.DataFrame:
+        crudo = pd.read_csv(RAW_PATH, dtype=str).head(filas)
+        for i in range(n_conductores):
+            crudo[COLUMNAS_GOOGLE].to_csv(directorio / f"rider{i:02d}_google.csv", index=False)
+            crudo[COLUMNAS_DIDI].to_csv(directorio / f"rider{i:02d}_didi.csv", index=False)
+        return crudo
+    return _exportar
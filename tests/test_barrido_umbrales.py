@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import PROCESSED_PATH
+from barrido_umbrales import (construir_indice, generar_combinaciones,
+                              evaluar_combinaciones, barrer_umbrales, PARAMETROS)
+
+REJILLA = {
+    'ro_optimo_min': [1.60, 1.70, 1.73],
+    'ro_optimo_max': [1.80, 1.84, 2.00],
+    'ro_critico':    [1.95, 2.00, 2.10],
+    'pico_inicio':   [13, 17],
+    'pico_fin':      [21, 24],
+}
+
+
+@pytest.fixture(scope='module')
+def df():
+    return pd.read_csv(PROCESSED_PATH, dtype={'fecha': str, 'h_inicio': str, 'h_fin': str})
+
+
+def _fuerza_bruta(df, c):
+    ro   = df['ratio_optimizacion']
+    hora = df['h_inicio'].str.split(':').str[0].astype(int)
+    opt  = ro.between(c['ro_optimo_min'], c['ro_optimo_max'])
+    crit = ro >= c['ro_critico']
+    pico = (hora >= c['pico_inicio']) & (hora < c['pico_fin'])
+    return {
+        'n_optima':         opt.sum(),
+        'n_critica':        crit.sum(),
+        'n_pico':           pico.sum(),
+        'lift_utilidad':    df.loc[opt, 'utilidad_neta'].mean() - df.loc[~opt, 'utilidad_neta'].mean(),
+        'caida_eficiencia': (df.loc[opt, 'eficiencia_cumplimiento'].mean() -
+                             df.loc[crit, 'eficiencia_cumplimiento'].mean()),
+        'lift_pico':        (df.loc[pico, 'utilidad_por_hora'].mean() -
+                             df.loc[~pico, 'utilidad_por_hora'].mean()),
+    }
+
+
+def test_sumas_prefijas_coinciden_con_mascaras(df):
+    res = evaluar_combinaciones(construir_indice(df), generar_combinaciones(REJILLA), min_soporte=0)
+    assert len(res)
+    for fila in res.to_dict('records'):
+        esperado = _fuerza_bruta(df, fila)
+        for clave in ('n_optima', 'n_critica', 'n_pico'):
+            assert fila[clave] == esperado[clave]
+        for clave, tol in (('lift_utilidad', 1), ('caida_eficiencia', 1e-4), ('lift_pico', 0.01)):
+            if np.isfinite(esperado[clave]):
+                assert fila[clave] == pytest.approx(esperado[clave], abs=tol)
+
+
+def test_zonas_disjuntas():
+    combos = pd.DataFrame(generar_combinaciones(REJILLA), columns=PARAMETROS)
+    assert (combos['ro_optimo_max'] < combos['ro_critico']).all()
+    assert (combos['ro_optimo_min'] < combos['ro_optimo_max']).all()
+
+
+def test_pool_igual_a_secuencial(df):
+    secuencial = barrer_umbrales(df, REJILLA, n_procesos=1)
+    paralelo   = barrer_umbrales(df, REJILLA, n_procesos=2)
+    pd.testing.assert_frame_equal(secuencial, paralelo)
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from consultas import construir_indices, consultar, vista
+
+
+def _indices(ro):
+    n = len(ro)
+    df = pd.DataFrame({
+        'fecha': pd.date_range('2025-12-01', periods=n).strftime('%Y-%m-%d'),
+        'ratio_optimizacion': ro,
+        'franja_pico': np.arange(n) % 2,
+        'zona_arbitraje_optima': 0, 'alerta_critica': 0, 'flag_gasto_cero': 0,
+    })
+    return construir_indices(df)
+
+
+def test_vista_sin_ordenar_respeta_posiciones():
+    idx = _indices([1.0, 9, 1.2, 1.3, 9, 9, 9, 9, 9, 1.1])
+    pos = consultar(idx, ro=(0, 2), ordenar=False)
+    assert sorted(pos) == [0, 2, 3, 9]
+    v = vista(idx, pos)
+    assert list(v.index) == list(pos)
+    assert (v['ratio_optimizacion'] <= 2).all()
+
+
+def test_vista_contigua_es_slice():
+    idx = _indices([1.0, 1.1, 1.2, 9.0])
+    v = vista(idx, consultar(idx, ro=(0, 2)))
+    assert list(v.index) == [0, 1, 2]
+
+
+def test_consultar_coincide_con_mascara():
+    rng = np.random.default_rng(0)
+    idx = _indices(rng.normal(1.7, 0.2, 500).round(3))
+    df = idx['df']
+    pos = consultar(idx, fecha=('2026-01-01', '2026-03-31'), ro=(1.6, 1.8), franja_pico=1)
+    mascara = ((df['fecha'] >= '2026-01-01') & (df['fecha'] <= '2026-03-31') &
+               df['ratio_optimizacion'].between(1.6, 1.8) & (df['franja_pico'] == 1))
+    assert list(pos) == list(np.flatnonzero(mascara))
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indice_horario import (exposicion_horaria, construir_indice_horario,
+                            consultar_ventana, exposicion_pico, METRICAS_ATRIBUIBLES)
+
+
+def _jornadas(horarios):
+    n = len(horarios)
+    df = pd.DataFrame(horarios, columns=['h_inicio', 'h_fin'])
+    df['fecha'] = '2025-12-06'
+    for i, col in enumerate(METRICAS_ATRIBUIBLES):
+        df[col] = np.arange(1, n + 1) * 10.0 ** (i + 1)
+    return df
+
+
+def test_cruce_de_medianoche():
+    expo = exposicion_horaria(_jornadas([('22:30', '01:15')]))[0]
+    assert expo.sum() == pytest.approx(2.75)
+    assert expo[22] == pytest.approx(0.5)
+    assert expo[23] == pytest.approx(1.0)
+    assert expo[0] == pytest.approx(1.0)
+    assert expo[1] == pytest.approx(0.25)
+
+
+def test_totales_se_conservan_con_jornada_de_duracion_cero():
+    df = _jornadas([('13:34', '23:56'), ('18:00', '18:00'), ('23:00', '02:00')])
+    indice = construir_indice_horario(df)
+    for col in METRICAS_ATRIBUIBLES:
+        assert indice[col].sum() == pytest.approx(df[col].sum())
+    assert indice['jornadas'][18] == 2
+
+
+def test_ventanas():
+    df = _jornadas([('13:34', '23:56'), ('23:00', '02:00')])
+    indice = construir_indice_horario(df)
+    dia = consultar_ventana(indice, 0, 24)
+    assert dia['horas_expuestas'] == pytest.approx(10.37 + 3, abs=0.01)
+    noche = consultar_ventana(indice, 22, 2)
+    assert noche['horas_expuestas'] == pytest.approx(1.93 + 3, abs=0.01)
+    vacia = consultar_ventana(indice, 18, 18)
+    assert vacia['horas_expuestas'] == 0
+    assert (exposicion_pico(indice, 18, 18) == 0).all()
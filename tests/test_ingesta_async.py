@@ -0,0 +1,67 @@
+import asyncio
+import inspect
+
+import pandas as pd
+import pytest
+
+import ingesta_async
+
+from main import PROCESSED_PATH, FLOTA_PATH
+from ingesta_async import ingerir_async, ejecutar_pipeline_async, COLUMNAS_GOOGLE, COLUMNAS_DIDI
+
+
+def _ingerir(directorio, **kwargs):
+    return asyncio.run(asyncio.wait_for(ingerir_async([str(directorio)], **kwargs), timeout=10))
+
+
+def test_ingesta_conserva_conductor(tmp_path, exportar_flota):
+    exportar_flota(tmp_path, 3)
+    df = _ingerir(tmp_path)
+    assert len(df) == 15
+    assert sorted(df['conductor'].unique()) == ['rider00', 'rider01', 'rider02']
+
+
+def test_bloque_invalido_cancela_productores(tmp_path, exportar_flota):
+    crudo = exportar_flota(tmp_path, 12)
+    malo = crudo[COLUMNAS_DIDI].copy()
+    malo.loc[0, 'h_fin'] = 'xx:yy'
+    malo.to_csv(tmp_path / "rider05_didi.csv", index=False)
+    with pytest.raises(ValueError, match="rider05"):
+        _ingerir(tmp_path, max_concurrencia=12, tamano_cola=2)
+
+
+def test_jornada_duplicada_cancela_productores(tmp_path, exportar_flota):
+    crudo = exportar_flota(tmp_path, 12)
+    duplicado = pd.concat([crudo[COLUMNAS_GOOGLE], crudo[COLUMNAS_GOOGLE].head(1)])
+    duplicado.to_csv(tmp_path / "rider07_google.csv", index=False)
+    with pytest.raises(ValueError, match="rider07"):
+        _ingerir(tmp_path, max_concurrencia=12, tamano_cola=2)
+
+
+def test_exportacion_flota_conserva_conductor(tmp_path, exportar_flota):
+    fuentes = tmp_path / 'fuentes'
+    fuentes.mkdir()
+    exportar_flota(fuentes, 2)
+    salida = tmp_path / 'flota.csv'
+    ejecutar_pipeline_async([str(fuentes)], str(salida))
+    df = pd.read_csv(salida)
+    assert df.columns[0] == 'conductor'
+    assert df.shape == (10, 29)
+
+
+def test_salida_por_defecto_no_pisa_dataset_individual():
+    destino = inspect.signature(ejecutar_pipeline_async).parameters['processed_path'].default
+    assert destino == FLOTA_PATH != PROCESSED_PATH
+
+
+def test_errores_adicionales_se_reportan(tmp_path, exportar_flota, capsys, monkeypatch):
+    exportar_flota(tmp_path, 3)
+
+    async def productor_fallido(conductor, *args):
+        raise ValueError(f"[INGESTA ERROR] {conductor}: fallo simulado")
+
+    monkeypatch.setattr(ingesta_async, '_productor', productor_fallido)
+    with pytest.raises(ValueError, match="rider00"):
+        _ingerir(tmp_path)
+    salida = capsys.readouterr().out
+    assert "rider01" in salida and "rider02" in salida
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from main import PROCESSED_PATH
+from modelo_prescriptivo import (FEATURES, OBJETIVO, acumular_gram, ajustar_modelo,
+                                 gram_cacheada, matriz_diseno)
+
+
+def _dataset(n=5_000):
+    df = pd.read_csv(PROCESSED_PATH)
+    rng = np.random.default_rng(0)
+    grande = df.iloc[rng.integers(0, len(df), n)].reset_index(drop=True)
+    grande['utilidad_neta'] = grande['utilidad_neta'] + rng.normal(0, 1_000, n)
+    return grande
+
+
+def _igual(a, b):
+    return (a['n'] == b['n'] and np.allclose(a['xtx'], b['xtx'])
+            and np.allclose(a['xty'], b['xty']) and np.isclose(a['yty'], b['yty']))
+
+
+def test_cache_n_mas_1_igual_a_reconstruccion(tmp_path):
+    df, ruta = _dataset(), str(tmp_path / 'gram.npz')
+    gram_cacheada(df.iloc[:4_000], ruta)
+    assert _igual(gram_cacheada(df, ruta), acumular_gram(df))
+
+
+def test_edicion_reciente_invalida_cache(tmp_path):
+    df, ruta = _dataset(), str(tmp_path / 'gram.npz')
+    gram_cacheada(df.iloc[:4_000], ruta)
+    df.loc[3_990, 'utilidad_neta'] += 50_000
+    assert _igual(gram_cacheada(df, ruta), acumular_gram(df))
+
+
+def test_edicion_intermedia_invalida_cache(tmp_path):
+    df, ruta = _dataset(), str(tmp_path / 'gram.npz')
+    gram_cacheada(df.iloc[:4_000], ruta)
+    df.loc[100, 'pedidos_fisicos'] += 3
+    assert _igual(gram_cacheada(df, ruta), acumular_gram(df))
+
+
+def _coeficientes(modelo):
+    return np.array([modelo['intercepto']] + [modelo['coeficientes'][f] for f in FEATURES])
+
+
+def test_ajuste_ols_igual_a_lstsq():
+    df = _dataset()
+    esperado, *_ = np.linalg.lstsq(matriz_diseno(df), df[OBJETIVO].to_numpy(dtype=float), rcond=None)
+    modelo = ajustar_modelo(acumular_gram(df))
+    assert np.allclose(_coeficientes(modelo), esperado, atol=0.01)
+
+
+def test_ajuste_ridge_igual_a_lstsq_aumentado():
+    df, lam = _dataset(), 0.5
+    X, y = matriz_diseno(df)[:, 1:], df[OBJETIVO].to_numpy(dtype=float)
+    Xc, yc = X - X.mean(axis=0), y - y.mean()
+    penal = np.diag(np.sqrt(lam * (Xc ** 2).sum(axis=0)))
+    beta, *_ = np.linalg.lstsq(np.vstack([Xc, penal]),
+                               np.concatenate([yc, np.zeros(len(FEATURES))]), rcond=None)
+    esperado = np.concatenate([[y.mean() - X.mean(axis=0) @ beta], beta])
+
+    ridge = ajustar_modelo(acumular_gram(df), lambda_ridge=lam)
+    ols   = ajustar_modelo(acumular_gram(df))
+    assert np.allclose(_coeficientes(ridge), esperado, atol=0.01)
+    assert np.linalg.norm(_coeficientes(ridge)[1:]) < np.linalg.norm(_coeficientes(ols)[1:])
@@ -0,0 +1,29 @@
+import os
+
+import pandas as pd
+
+from ingesta_async import ejecutar_pipeline_async
+from reportes_flota import generar_reportes, _nombre_carpeta
+
+
+def test_ingesta_y_reportes_por_conductor(tmp_path, exportar_flota):
+    fuentes = tmp_path / 'fuentes'
+    fuentes.mkdir()
+    exportar_flota(fuentes, 2, filas=8)
+    flota = tmp_path / 'flota.csv'
+    ejecutar_pipeline_async([str(fuentes)], str(flota))
+
+    salida = tmp_path / 'reportes'
+    df = pd.read_csv(flota, dtype={'conductor': str})
+    res = generar_reportes(df, str(salida), png=False, n_procesos=2)
+    assert (res['generados'], res['omitidos'], res['fallidos']) == (2, 0, [])
+    for conductor in ('rider00', 'rider01'):
+        assert os.path.exists(salida / _nombre_carpeta(conductor) / 'reporte.html')
+
+    res = generar_reportes(df, str(salida), png=False, n_procesos=2)
+    assert (res['generados'], res['omitidos']) == (0, 2)
+
+
+def test_carpetas_distintas_para_ids_que_colisionan_al_sanear():
+    assert _nombre_carpeta('a b') != _nombre_carpeta('a_b')
+    assert _nombre_carpeta('A') != _nombre_carpeta('a')
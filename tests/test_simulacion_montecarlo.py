@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+
+from main import PROCESSED_PATH, RO_CRITICO
+from simulacion_montecarlo import preparar_base, simular_turno
+
+N = 50_000
+
+
+@pytest.fixture(scope='module')
+def base():
+    return preparar_base(pd.read_csv(PROCESSED_PATH))
+
+
+def test_umbral_por_defecto_es_mediana_utilidad_hora(base):
+    res = simular_turno(base, pedidos=13, ro=1.78, hora_inicio='18:00', n_trayectorias=N)
+    assert res['umbral'] == round(base['utilidad_hora_mediana'], 2)
+    assert 0.05 < res['prob_supera_umbral'] < 0.95
+
+
+@pytest.mark.parametrize('hora', ['18:00', '10:00'])
+@pytest.mark.parametrize('pedidos', [5, 13, 20])
+def test_probabilidad_cae_al_entrar_en_zona_critica(base, pedidos, hora):
+    probs = [simular_turno(base, pedidos=pedidos, ro=ro, hora_inicio=hora,
+                           n_trayectorias=N)['prob_supera_umbral']
+             for ro in (1.6, 1.8, 2.0, 2.2, 2.6)]
+    assert probs == sorted(probs, reverse=True)
+    assert probs[-1] < probs[1] - 0.2
+
+
+@pytest.mark.parametrize('ro', [RO_CRITICO + 0.2, 2.5, 3.4])
+def test_ro_critico_no_recomienda_operar(base, ro):
+    res = simular_turno(base, pedidos=13, ro=ro, hora_inicio='18:00', n_trayectorias=N)
+    assert res['decision'] != 'SÍ OPERAR'
+    assert res['prob_ro_critico'] > 0.9
+
+
+def test_umbral_configurable(base):
+    facil   = simular_turno(base, pedidos=13, ro=1.78, hora_inicio='18:00', umbral=0, n_trayectorias=N)
+    dificil = simular_turno(base, pedidos=13, ro=1.78, hora_inicio='18:00', umbral=40_000, n_trayectorias=N)
+    assert facil['umbral'] == 0 and facil['decision'] == 'SÍ OPERAR'
+    assert dificil['decision'] == 'NO OPERAR'
@@ -0,0 +1,76 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import PROCESSED_PATH
+from snapshots import (guardar_snapshot, cargar_manifiesto, cargar_snapshot,
+                       diferenciar, _cortes, BLOQUE_MEDIO)
+
+
+@pytest.fixture(scope='module')
+def grande():
+    """~8 bloques esperados: jornadas reales remuestreadas con claves únicas."""
+    df = pd.read_csv(PROCESSED_PATH, dtype={'fecha': str, 'h_inicio': str, 'h_fin': str})
+    n = 8 * BLOQUE_MEDIO
+    g = df.iloc[np.arange(n) % len(df)].reset_index(drop=True)
+    g['fecha'] = (np.datetime64('2020-01-01') + np.arange(n).astype('timedelta64[D]')).astype(str)
+    return g
+
+
+def _inv(**extra):
+    return {'N_total': 1, 'ro_media': np.float64(1.7), **extra}
+
+
+def _bloques_nuevos(capsys):
+    return int(capsys.readouterr().out.split('·')[-1].split()[0])
+
+
+def test_cortes_estables_ante_n_mas_1(grande):
+    cortes = _cortes(grande)
+    assert len(cortes) > 1
+    assert cortes[0][0] == 0 and cortes[-1][1] == len(grande)
+    assert all(a[1] == b[0] for a, b in zip(cortes, cortes[1:]))
+    # Una jornada al final solo puede alterar el último bloque
+    mas_uno = pd.concat([grande, grande.iloc[[0]].assign(fecha='2099-01-01')], ignore_index=True)
+    assert _cortes(mas_uno)[:-1] == cortes[:-1]
+
+
+def test_deduplicacion_y_reconstruccion(grande, tmp_path, capsys):
+    raiz = str(tmp_path)
+    id_a = guardar_snapshot(grande, _inv(), raiz)
+    n_a = _bloques_nuevos(capsys)
+    guardar_snapshot(grande, _inv(), raiz)
+    assert _bloques_nuevos(capsys) == 0
+    assert len(os.listdir(os.path.join(raiz, 'bloques'))) == n_a
+
+    restaurado = cargar_snapshot(id_a, raiz)
+    pd.testing.assert_frame_equal(restaurado[['fecha', 'h_inicio', 'pedidos_fisicos']],
+                                  grande[['fecha', 'h_inicio', 'pedidos_fisicos']])
+
+
+def test_diferenciar_lee_solo_bloques_distintos(grande, tmp_path):
+    raiz = str(tmp_path)
+    id_a = guardar_snapshot(grande, _inv(), raiz)
+    b = grande.copy()
+    b.loc[5, 'pedidos_fisicos'] += 1
+    b = pd.concat([b, b.iloc[[0]].assign(fecha='2099-01-01')], ignore_index=True)
+    id_b = guardar_snapshot(b, _inv(ro_media=np.float64(1.8)), raiz)
+
+    diff = diferenciar(id_a, id_b, raiz)
+    assert diff['invariantes'] == {'ro_media': (1.7, 1.8)}
+    assert diff['altas'] == [('2099-01-01', b.loc[0, 'h_inicio'])]
+    assert diff['bajas'] == []
+    assert diff['modificadas'] == {(grande.loc[5, 'fecha'], grande.loc[5, 'h_inicio']): ['pedidos_fisicos']}
+    assert diff['bloques_leidos'] < diff['bloques_totales']
+
+
+def test_invariantes_nan(grande, tmp_path):
+    raiz = str(tmp_path)
+    id_a = guardar_snapshot(grande.head(10), _inv(p_value=np.float64('nan')), raiz)
+    id_b = guardar_snapshot(grande.head(10), _inv(N_total=2, p_value=float('nan')), raiz)
+    assert cargar_manifiesto(id_a, raiz)['invariantes']['p_value'] is None
+    with open(os.path.join(raiz, 'manifiestos', f"{id_a}.json"), encoding='utf-8') as f:
+        assert 'NaN' not in f.read()
+    assert diferenciar(id_a, id_b, raiz)['invariantes'] == {'N_total': (1, 2)}
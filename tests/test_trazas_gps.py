@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import RAW_PATH
+from trazas_gps import km_traza, km_por_jornada, longitud_haversine, aplicar_km_trazas
+
+
+def _escribir_gpx(ruta, segmentos):
+    with open(ruta, 'w') as f:
+        f.write('<?xml version="1.0"?><gpx xmlns="http://www.topografix.com/GPX/1/1"><trk>\n')
+        for lat, lon in segmentos:
+            f.write('<trkseg>\n')
+            f.writelines(f'<trkpt lat="{a}" lon="{o}"><ele>2600</ele></trkpt>\n'
+                         for a, o in zip(lat, lon))
+            f.write('</trkseg>\n')
+        f.write('</trk></gpx>\n')
+
+
+def _escribir_csv(ruta, lat, lon):
+    with open(ruta, 'w') as f:
+        f.write('lat,lon\n')
+        f.writelines(f'{a},{o}\n' for a, o in zip(lat, lon))
+
+
+def test_gpx_mide_segmentos_por_separado(tmp_path):
+    seg1 = (np.array([4.57, 4.58, 4.59]), np.array([-74.09, -74.09, -74.09]))
+    seg2 = (np.array([4.60, 4.61]), np.array([-74.10, -74.10]))
+    ruta = tmp_path / '2025-12-06_1334.gpx'
+    _escribir_gpx(ruta, [seg1, seg2])
+    km, puntos = km_traza(str(ruta), tamano_bloque=2)
+    assert puntos == 5
+    assert km == pytest.approx(longitud_haversine(*seg1) + longitud_haversine(*seg2))
+
+
+def test_traza_duplicada_por_jornada_y_fuente(tmp_path):
+    lat, lon = np.array([4.57, 4.58]), np.array([-74.09, -74.09])
+    _escribir_csv(tmp_path / '2025-12-06_1334.csv', lat, lon)
+    _escribir_gpx(tmp_path / '2025-12-06_1334.gpx', [(lat, lon)])
+    with pytest.raises(ValueError, match='2025-12-06_1334.gpx'):
+        km_por_jornada(str(tmp_path))
+
+
+def test_fuentes_distintas_no_son_duplicado(tmp_path):
+    lat, lon = np.array([4.57, 4.58]), np.array([-74.09, -74.09])
+    _escribir_csv(tmp_path / '2025-12-06_1334.csv', lat, lon)
+    _escribir_csv(tmp_path / '2025-12-06_1334_didi.csv', lat, lon)
+    km = km_por_jornada(str(tmp_path))
+    assert len(km) == 1
+    assert km.loc[0, 'km_google_maps'] == km.loc[0, 'km_didi_app'] == round(longitud_haversine(lat, lon), 2)
+
+
+def test_trazas_sin_jornada_se_reportan(tmp_path, capsys):
+    lat, lon = np.array([4.57, 4.58]), np.array([-74.09, -74.09])
+    _escribir_csv(tmp_path / '2025-12-06_1334.csv', lat, lon)
+    _escribir_csv(tmp_path / '2030-01-01_0800.csv', lat, lon)
+    crudo = pd.read_csv(RAW_PATH, dtype={'fecha': str, 'h_inicio': str, 'h_fin': str})
+    df = aplicar_km_trazas(crudo, km_por_jornada(str(tmp_path)))
+    salida = capsys.readouterr().out
+    assert "2030-01-01 08:00" in salida
+    assert "1 valores de km reemplazados (1 jornadas con traza" in salida
+    assert df.loc[0, 'km_google_maps'] == round(longitud_haversine(lat, lon), 2)